@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+import multiprocessing
 import argparse
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QSplashScreen
@@ -102,4 +103,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # Necessário no executável congelado do Windows: os processos de importação usam spawn
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
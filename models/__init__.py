@@ -3,5 +3,7 @@ from .data_manager import DataManager
 from .config_manager import ConfigManager
 from .search_manager import SearchManager
 from .file_loader import FileLoaderThread
+from .search_worker import SearchWorkerThread
+from .index_sidecar import IndexSidecar
 
-__all__ = ['ExcelManager', 'DataManager', 'ConfigManager', 'SearchManager', 'FileLoaderThread']
\ No newline at end of file
+__all__ = ['ExcelManager', 'DataManager', 'ConfigManager', 'SearchManager', 'FileLoaderThread', 'SearchWorkerThread', 'IndexSidecar']
\ No newline at end of file
@@ -0,0 +1,176 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+
+
+class BackupStore:
+    """
+    Backups endereçados pelo conteúdo: cada versão distinta de um arquivo é
+    guardada uma única vez em objetos/<hash>.feather (hardlink quando o sistema
+    permite, senão cópia) e um catálogo JSON registra, por arquivo, a data, o
+    número de linhas e o hash de cada versão.
+
+    Listar versões e aplicar a retenção só leem/alteram o catálogo; objetos
+    são apagados quando nenhuma entrada aponta mais para eles.
+    """
+
+    CATALOG_NAME = 'catalogo.json'
+    OBJECTS_DIR = 'objetos'
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, backup_dir: str = os.path.join("resources", "backup")):
+        self.backup_dir = backup_dir
+        self.objects_dir = os.path.join(backup_dir, self.OBJECTS_DIR)
+        self.catalog_path = os.path.join(backup_dir, self.CATALOG_NAME)
+        self._trava = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def criar(self, file_path: str) -> Dict[str, Any]:
+        """
+        Registra a versão atual do arquivo. Se o conteúdo não mudou desde o
+        último backup do mesmo arquivo, nada é gravado.
+
+        Returns:
+            Entrada do catálogo correspondente ao conteúdo atual
+        """
+        stat = os.stat(file_path)
+        arquivo = self._chave_arquivo(file_path)
+        with self._trava:
+            catalogo = self._ler_catalogo()
+            anteriores = [e for e in catalogo if e['arquivo'] == arquivo]
+            ultima = anteriores[-1] if anteriores else None
+            # Mesmo tamanho e mtime: o arquivo não foi regravado, nem precisa de hash
+            if ultima and ultima['tamanho'] == stat.st_size and ultima['mtime_ns'] == stat.st_mtime_ns:
+                return ultima
+
+            digest = self._hash_arquivo(file_path)
+            if ultima and ultima['hash'] == digest:
+                return ultima
+
+            self._guardar_objeto(file_path, digest)
+            entrada = {
+                'arquivo': arquivo,
+                'nome': os.path.basename(file_path),
+                'hash': digest,
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'linhas': self._contar_linhas(file_path),
+                'tamanho': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            }
+            catalogo.append(entrada)
+            self._gravar_catalogo(catalogo)
+            self.logger.debug(f"Backup registrado: {entrada['nome']} ({digest})")
+            return entrada
+
+    def listar(self, file_path: str) -> List[Dict[str, Any]]:
+        """Versões guardadas do arquivo, da mais recente para a mais antiga (só lê o catálogo)"""
+        arquivo = self._chave_arquivo(file_path)
+        with self._trava:
+            catalogo = self._ler_catalogo()
+        return [e for e in reversed(catalogo) if e['arquivo'] == arquivo]
+
+    def reter(self, file_path: str, maximo: int) -> int:
+        """
+        Mantém só as `maximo` versões mais recentes do arquivo e apaga os
+        objetos que ficaram sem referência.
+
+        Returns:
+            Número de versões removidas do catálogo
+        """
+        arquivo = self._chave_arquivo(file_path)
+        with self._trava:
+            catalogo = self._ler_catalogo()
+            do_arquivo = [e for e in catalogo if e['arquivo'] == arquivo]
+            excedentes = do_arquivo[:max(0, len(do_arquivo) - maximo)]
+            if not excedentes:
+                return 0
+
+            removidas = {id(e) for e in excedentes}
+            catalogo = [e for e in catalogo if id(e) not in removidas]
+            self._gravar_catalogo(catalogo)
+
+            em_uso = {e['hash'] for e in catalogo}
+            for digest in {e['hash'] for e in excedentes} - em_uso:
+                try:
+                    os.remove(self._caminho_objeto(digest))
+                    self.logger.debug(f"Backup removido: {digest}")
+                except OSError as e:
+                    self.logger.warning(f"Falha ao remover backup {digest}: {e}")
+            return len(excedentes)
+
+    def restaurar(self, entrada: Dict[str, Any], destino: str):
+        """Substitui o arquivo de destino pela versão guardada (temporário + troca atômica)"""
+        origem = self._caminho_objeto(entrada['hash'])
+        tmp_path = f"{destino}.tmp"
+        try:
+            # copyfile (sem copiar o mtime): o sidecar de índices do destino não pode conferir
+            shutil.copyfile(origem, tmp_path)
+            os.replace(tmp_path, destino)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _guardar_objeto(self, file_path: str, digest: str):
+        """Guarda o conteúdo uma única vez; o .feather é sempre regravado por troca, então o hardlink não muda"""
+        destino = self._caminho_objeto(digest)
+        if os.path.exists(destino):
+            return
+        os.makedirs(self.objects_dir, exist_ok=True)
+        try:
+            os.link(file_path, destino)
+        except OSError:
+            # Outro volume ou sistema de arquivos sem hardlinks
+            tmp_path = f"{destino}.tmp"
+            shutil.copy2(file_path, tmp_path)
+            os.replace(tmp_path, destino)
+
+    def _caminho_objeto(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.feather")
+
+    def _ler_catalogo(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.catalog_path):
+            return []
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                catalogo = json.load(f)
+            return catalogo if isinstance(catalogo, list) else []
+        except Exception as e:
+            self.logger.warning(f"Catálogo de backups ilegível ({self.catalog_path}): {e}")
+            return []
+
+    def _gravar_catalogo(self, catalogo: List[Dict[str, Any]]):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        tmp_path = f"{self.catalog_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(catalogo, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.catalog_path)
+
+    @staticmethod
+    def _chave_arquivo(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    @staticmethod
+    def _contar_linhas(file_path: str) -> Optional[int]:
+        """Número de linhas lido dos metadados do Arrow, sem carregar as colunas"""
+        try:
+            with pa.memory_map(file_path) as origem:
+                return pa.ipc.open_file(origem).count_rows()
+        except Exception:
+            return None
+
+    def _hash_arquivo(self, file_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for bloco in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(bloco)
+        return digest.hexdigest()
@@ -0,0 +1,103 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+
+class ChangeJournal:
+    """
+    Diário de alterações ao lado do .feather (ex.: alunos.feather -> alunos.feather.journal).
+
+    Cada comando acrescenta apenas as linhas que mudou, em JSON (uma entrada por
+    linha), em vez de regravar o arquivo inteiro. A primeira linha guarda o
+    tamanho e o mtime do .feather ao qual o diário se aplica: ao compactar, o
+    .feather é regravado antes do diário ser apagado, então um diário que sobrar
+    de uma queda entre as duas etapas deixa de conferir e é ignorado.
+    """
+
+    VERSION = 1
+    SUFFIX = '.journal'
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def journal_path(self, feather_path: str) -> str:
+        """Caminho do diário correspondente ao arquivo .feather"""
+        return f"{feather_path}{self.SUFFIX}"
+
+    def anexar(self, feather_path: str, entradas: List[Dict[str, Any]]) -> bool:
+        """Acrescenta entradas ao diário, criando o cabeçalho se ele ainda não existir"""
+        path = self.journal_path(feather_path)
+        try:
+            linhas = []
+            if not os.path.exists(path):
+                linhas.append({'versao': self.VERSION, 'chave': self._calcular_chave(feather_path)})
+            linhas.extend(entradas)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(linha, ensure_ascii=False) + '\n' for linha in linhas))
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            self.logger.warning(f"Falha ao gravar diário de alterações ({path}): {e}")
+            return False
+
+    def ler(self, feather_path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Lê as entradas do diário, se existir e ainda corresponder ao .feather.
+        Uma última linha incompleta (queda no meio da gravação) é descartada.
+
+        Returns:
+            Lista de entradas ou None se o diário estiver ausente/obsoleto
+        """
+        path = self.journal_path(feather_path)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                linhas = f.read().splitlines()
+        except Exception as e:
+            self.logger.warning(f"Diário de alterações ilegível ({path}): {e}")
+            return None
+
+        entradas = []
+        for numero, linha in enumerate(linhas):
+            try:
+                entradas.append(json.loads(linha))
+            except ValueError:
+                if numero == len(linhas) - 1:
+                    self.logger.warning(f"Última entrada incompleta ignorada no diário: {path}")
+                    break
+                self.logger.warning(f"Diário de alterações corrompido na linha {numero + 1}: {path}")
+                return None
+
+        if not entradas or entradas[0].get('versao') != self.VERSION:
+            self.logger.debug(f"Diário com versão incompatível: {path}")
+            return None
+
+        if entradas[0].get('chave') != self._calcular_chave(feather_path):
+            self.logger.warning(f"Diário não corresponde mais ao arquivo e foi ignorado: {path}")
+            return None
+
+        return entradas[1:]
+
+    def tamanho(self, feather_path: str) -> int:
+        """Tamanho do diário em bytes (0 se não existir)"""
+        try:
+            return os.path.getsize(self.journal_path(feather_path))
+        except OSError:
+            return 0
+
+    def descartar(self, feather_path: str):
+        """Apaga o diário (chamado depois que o .feather foi regravado)"""
+        try:
+            os.remove(self.journal_path(feather_path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Falha ao apagar diário de alterações: {e}")
+
+    def _calcular_chave(self, feather_path: str) -> Dict[str, int]:
+        stat = os.stat(feather_path)
+        return {'tamanho': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
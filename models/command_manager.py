@@ -1,10 +1,13 @@
 import logging
 from PyQt5.QtCore import QObject, pyqtSignal, QThread, QThreadPool, QRunnable
-import pandas as pd
 from typing import List, Dict, Any
 from functools import partial
 
 class Command:
+    # Linhas afetadas pela última execução/undo/redo, por ID estável, para a
+    # tabela aplicar só a diferença: {'inseridos': [...], 'removidos': [...], 'alterados': [...]}
+    alteracoes = None
+
     def execute(self):
         raise NotImplementedError
 
@@ -14,6 +17,13 @@ class Command:
     def redo(self):
         return self.execute()
 
+    def _registrar_alteracoes(self, inseridos=(), removidos=(), alterados=()):
+        self.alteracoes = {
+            'inseridos': list(inseridos),
+            'removidos': list(removidos),
+            'alterados': list(alterados)
+        }
+
 # CORRETO
 class CommandWorker(QRunnable):
     # ❌ Remova a linha abaixo — já existe em CommandWorkerSignals
@@ -46,6 +56,7 @@ class CommandWorkerSignals(QObject):
 class CommandManager(QObject):
     operation_started = pyqtSignal(str)
     operation_finished = pyqtSignal(bool, str)
+    rows_changed = pyqtSignal(object)  # Command.alteracoes, emitido antes de operation_finished
 
     def __init__(self, max_history=50, max_threads=4):
         super().__init__()
@@ -75,6 +86,7 @@ class CommandManager(QObject):
                 self.undo_stack.pop(0)
             self.undo_stack.append(command)
             self.redo_stack.clear()
+            self.rows_changed.emit(command.alteracoes)
             self.operation_finished.emit(True, "Operação concluída!")
         else:
             self.operation_finished.emit(False, "Falha na operação")
@@ -91,6 +103,7 @@ class CommandManager(QObject):
         if success:
             self.undo_stack.pop()
             self.redo_stack.append(command)
+            self.rows_changed.emit(command.alteracoes)
             self.operation_finished.emit(True, "Ação desfeita com sucesso")
         else:
             self.operation_finished.emit(False, "Falha ao desfazer ação")
@@ -107,6 +120,7 @@ class CommandManager(QObject):
         if success:
             self.redo_stack.pop()
             self.undo_stack.append(command)
+            self.rows_changed.emit(command.alteracoes)
             self.operation_finished.emit(True, "Ação refeita com sucesso")
         else:
             self.operation_finished.emit(False, "Falha ao refazer ação")
@@ -133,12 +147,18 @@ class AddStudentCommand(Command):
             self.student_data['Nome do(a) Aluno(a)'],
             self.student_data['RM']
         )
+        if self.was_added:
+            self._registrar_alteracoes(inseridos=[self.data_manager.get_row_id_por_rm(self.student_data['RM'])])
         return self.was_added
 
     def undo(self):
         if not self.was_added:
             return False
-        return self.data_manager.remover_alunos([self.student_data])
+        row_id = self.data_manager.get_row_id_por_rm(self.student_data['RM'])
+        removido = self.data_manager.remover_alunos([self.student_data])
+        if removido:
+            self._registrar_alteracoes(removidos=[row_id])
+        return removido
 
 class RemoveStudentsCommand(Command):
     def __init__(self, excel_manager, data_manager, students_data: List[Dict[str, Any]]):
@@ -150,22 +170,27 @@ class RemoveStudentsCommand(Command):
     def execute(self):
         if not hasattr(self.excel_manager, 'df') or self.excel_manager.df.empty:
             return False
-        self.removed_rows = self.excel_manager.df[
-            self.excel_manager.df['RM'].isin([s['RM'] for s in self.students_data])
-        ].copy()
-        return self.data_manager.remover_alunos(self.students_data)
+        self.removed_rows = self.data_manager.get_alunos_por_rms(
+            [s['RM'] for s in self.students_data]
+        ).copy()
+        removido = self.data_manager.remover_alunos(self.students_data)
+        if removido:
+            self._registrar_alteracoes(removidos=self.removed_rows.index)
+        return removido
 
     def undo(self):
         if self.removed_rows is None or self.removed_rows.empty:
             return False
-        self.excel_manager.df = pd.concat(
-            [self.excel_manager.df, self.removed_rows],
-            ignore_index=True
-        ).sort_values('RM', ascending=False).reset_index(drop=True)
-        self.data_manager._build_indexes()
-        return True
+        # Reinsere as linhas com seus IDs originais e indexa apenas elas
+        novas = self.removed_rows.index.difference(self.excel_manager.df.index, sort=False)
+        restaurado = self.data_manager.restaurar_alunos(self.removed_rows)
+        if restaurado:
+            self._registrar_alteracoes(inseridos=novas)
+        return restaurado
 
 class EditStudentCommand(Command):
+    """Edita uma célula; `row` é o ID estável da linha (rótulo do índice do DataFrame)."""
+
     def __init__(self, excel_manager, data_manager, row, col, old_value, new_value):
         self.excel_manager = excel_manager
         self.data_manager = data_manager
@@ -175,13 +200,13 @@ class EditStudentCommand(Command):
         self.new_value = new_value
 
     def execute(self):
-        df = self.excel_manager.df
-        df.iat[self.row, self.col] = self.new_value
-        self.data_manager._build_indexes()
-        return True
+        return self._editar(self.new_value)
 
     def undo(self):
-        df = self.excel_manager.df
-        df.iat[self.row, self.col] = self.old_value
-        self.data_manager._build_indexes()
-        return True
+        return self._editar(self.old_value)
+
+    def _editar(self, valor):
+        editado = self.data_manager.editar_campo(self.row, self.col, valor)
+        if editado:
+            self._registrar_alteracoes(alterados=[self.row])
+        return editado
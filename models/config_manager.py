@@ -8,9 +8,14 @@ class ConfigManager:
         "recent_files": [],
         "last_path": None,
         "theme": "light",
-        "max_recent_files": 5
+        "max_recent_files": 5,
+        "compact_storage": True,
+        "render_mode": "auto",
+        "lightweight_row_threshold": 20000
     }
 
+    RENDER_MODES = ("auto", "lightweight", "full")
+
     def __init__(self, config_file: str = "resources/config.json"):
         self.config_file = config_file
         self.config = self._load_config()
@@ -126,4 +131,45 @@ class ConfigManager:
         """
         if theme_name in ("light", "dark"):
             self.config["theme"] = theme_name
-            self.save_config()
\ No newline at end of file
+            self.save_config()
+
+    # Métodos para compact_storage
+    def get_compact_storage(self) -> bool:
+        """
+        Retorna se os dados devem ser mantidos no layout compacto
+        (sobrenomes categóricos, nomes em strings Arrow, RM int64).
+        """
+        return bool(self.config.get("compact_storage", True))
+
+    def set_compact_storage(self, enabled: bool):
+        """
+        Ativa/desativa o layout compacto (vale a partir do próximo carregamento).
+        """
+        self.config["compact_storage"] = bool(enabled)
+        self.save_config()
+
+    # Métodos para render_mode
+    def get_render_mode(self) -> str:
+        """
+        Retorna o modo de renderização das sombras: 'auto' (leve acima de
+        lightweight_row_threshold alunos), 'lightweight' (sempre leve) ou 'full'.
+        """
+        mode = self.config.get("render_mode", "auto")
+        return mode if mode in self.RENDER_MODES else "auto"
+
+    def set_render_mode(self, mode: str):
+        """
+        Define o modo de renderização, se válido.
+        """
+        if mode in self.RENDER_MODES:
+            self.config["render_mode"] = mode
+            self.save_config()
+
+    def get_lightweight_row_threshold(self) -> int:
+        """
+        Retorna a quantidade de alunos a partir da qual o modo 'auto' usa sombras leves.
+        """
+        try:
+            return int(self.config.get("lightweight_row_threshold", 20000))
+        except (TypeError, ValueError):
+            return 20000
@@ -1,17 +1,26 @@
+import numpy as np
 import pandas as pd
 import logging
+import threading
 from collections import defaultdict
-from typing import Dict, Any, Optional, List
-from utils.helpers import remove_acentos, formatar_nome, extrair_sobrenome
+from typing import Dict, Any, Optional, List, Tuple
+from utils.helpers import normalizar_texto, formatar_nome, extrair_sobrenome
+from models.index_sidecar import IndexSidecar
+from models.trigram_index import TrigramIndex
+from models.fuzzy_index import FuzzyTokenIndex
 
 class LevenshteinMatcher:
     """
     Implementa Levenshtein distance com otimizações:
+    - Kernel bit-paralelo (Myers/Hyyrö) para strings de até 64 caracteres
+    - API em lote: uma query contra vários candidatos empacotados em NumPy
     - Early exit quando distância excede threshold
     - Cache de distâncias pré-calculadas
-    - Hash-based filtering para rejeitar rapidamente candidatos ruins
     """
 
+    MAX_BITS = 64  # Tamanho máximo do padrão no kernel em lote (uint64)
+    BATCH_MIN_SIZE = 16  # Abaixo disso o kernel escalar é mais rápido que o NumPy
+
     def __init__(self, cache_size: int = 5000):
         self.distance_cache = {}
         self.cache_size = cache_size
@@ -23,9 +32,10 @@ class LevenshteinMatcher:
         max_dist permite parar quando distância excede o limite.
 
         Returns:
-            Distância Levenshtein (menor = mais similar)
+            Distância Levenshtein (menor = mais similar), ou max_dist + 1
+            se a distância exceder max_dist
         """
-        cache_key = f"{s1}|{s2}"
+        cache_key = (s1, s2, max_dist)
         if cache_key in self.distance_cache:
             return self.distance_cache[cache_key]
 
@@ -34,40 +44,160 @@ class LevenshteinMatcher:
         # Early exit: diferença de tamanho muito grande
         if max_dist is not None and abs(len_s1 - len_s2) > max_dist:
             dist = max_dist + 1
-            self._cache_distance(cache_key, dist)
-            return dist
-
-        # Strings idênticas
-        if s1 == s2:
-            self._cache_distance(cache_key, 0)
-            return 0
-
-        # Otimização: usar a string menor como primeira
-        if len_s1 > len_s2:
-            s1, s2 = s2, s1
-            len_s1, len_s2 = len_s2, len_s1
+        # Strings identicas
+        elif s1 == s2:
+            dist = 0
+        else:
+            # Otimização: usar a string menor como padrão
+            if len_s1 > len_s2:
+                s1, s2 = s2, s1
+            if len(s1) <= self.MAX_BITS:
+                dist = self._bit_parallel_distance(s1, s2, max_dist)
+            else:
+                dist = self._dp_distance(s1, s2, max_dist)
 
-        # DP otimizado usando apenas 2 linhas em vez de matriz completa
-        current_row = list(range(len_s2 + 1))
+        self._cache_distance(cache_key, dist)
+        return dist
 
-        for i in range(1, len_s1 + 1):
-            previous_row = current_row[:]
-            current_row[0] = i
+    @staticmethod
+    def _bit_parallel_distance(pattern: str, text: str, max_dist: int = None) -> int:
+        """
+        Algoritmo de Myers (formulação de Hyyrö): cada coluna da matriz de DP é
+        representada por vetores de bits, processando um caractere do texto
+        com um punhado de operações inteiras.
+        """
+        m = len(pattern)
+        if m == 0:
+            return len(text)
+
+        peq = {}
+        for i, c in enumerate(pattern):
+            peq[c] = peq.get(c, 0) | (1 << i)
+
+        mask = (1 << m) - 1
+        last = 1 << (m - 1)
+        pv, mv, score = mask, 0, m
+        remaining = len(text)
+
+        for c in text:
+            eq = peq.get(c, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+
+            # Cada caractere restante reduz a distância em no máximo 1
+            remaining -= 1
+            if max_dist is not None and score - remaining > max_dist:
+                return max_dist + 1
+
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+
+        return score
+
+    @staticmethod
+    def _dp_distance(s1: str, s2: str, max_dist: int = None) -> int:
+        """DP em duas linhas (fallback para padrões com mais de 64 caracteres)"""
+        previous_row = list(range(len(s2) + 1))
+        for i, c1 in enumerate(s1, 1):
+            current_row = [i]
+            for j, c2 in enumerate(s2, 1):
+                current_row.append(min(
+                    previous_row[j] + 1,
+                    current_row[j - 1] + 1,
+                    previous_row[j - 1] + (c1 != c2)
+                ))
+            # Early exit se toda a linha já excede o limite
+            if max_dist is not None and min(current_row) > max_dist:
+                return max_dist + 1
+            previous_row = current_row
+        return previous_row[-1]
+
+    @staticmethod
+    def empacotar(candidatos: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Empacota candidatos em uma matriz de code points (uint32, preenchida
+        com zeros) e um vetor com os tamanhos, para uso em distancias_em_lote.
+        """
+        tamanhos = np.fromiter((len(c) for c in candidatos), dtype=np.int64, count=len(candidatos))
+        largura = max(1, int(tamanhos.max())) if len(candidatos) else 1
+        codigos = np.array(candidatos, dtype=f'U{largura}').view(np.uint32).reshape(len(candidatos), largura)
+        return codigos, tamanhos
 
-            for j in range(1, len_s2 + 1):
-                add = previous_row[j] + 1
-                delete = current_row[j - 1] + 1
-                sub = previous_row[j - 1] + (s1[i - 1] != s2[j - 1])
-                current_row[j] = min(add, delete, sub)
+    def distancias_em_lote(self, query: str, empacotados: Tuple[np.ndarray, np.ndarray],
+                           max_dist=None) -> np.ndarray:
+        """
+        Distância de uma query contra todos os candidatos empacotados, com o
+        kernel bit-paralelo vetorizado (um uint64 de estado por candidato).
 
-                # Early exit se distância já excede limite
-                if max_dist is not None and current_row[j] > max_dist:
-                    self._cache_distance(cache_key, max_dist + 1)
-                    return max_dist + 1
+        Args:
+            query: Texto buscado (padrão)
+            empacotados: Resultado de empacotar()
+            max_dist: Limite (escalar ou array); distâncias acima viram max_dist + 1
 
-        dist = current_row[len_s2]
-        self._cache_distance(cache_key, dist)
-        return dist
+        Returns:
+            Array int64 com uma distância por candidato
+        """
+        codigos, tamanhos = empacotados
+        m = len(query)
+
+        if m == 0:
+            distancias = tamanhos.copy()
+        elif m > self.MAX_BITS:
+            candidatos = [''.join(map(chr, linha[:n])) for linha, n in zip(codigos, tamanhos)]
+            distancias = np.array(
+                [self._dp_distance(query, c) for c in candidatos], dtype=np.int64
+            )
+        else:
+            distancias = self._bit_parallel_batch(query, codigos, tamanhos)
+
+        if max_dist is not None:
+            distancias = np.where(distancias > max_dist, np.asarray(max_dist) + 1, distancias)
+        return distancias
+
+    @staticmethod
+    def _bit_parallel_batch(query: str, codigos: np.ndarray, tamanhos: np.ndarray) -> np.ndarray:
+        m = len(query)
+        um = np.uint64(1)
+        mask = np.uint64((1 << m) - 1)
+        last = np.uint64(1 << (m - 1))
+
+        peq = {}
+        for i, c in enumerate(query):
+            peq[ord(c)] = peq.get(ord(c), 0) | (1 << i)
+
+        # Tabela de máscaras apenas para os code points presentes nos candidatos
+        valores, inverso = np.unique(codigos, return_inverse=True)
+        tabela = np.array([peq.get(int(v), 0) for v in valores], dtype=np.uint64)
+        eq_matriz = tabela[inverso.reshape(-1)].reshape(codigos.shape)
+
+        k = len(tamanhos)
+        pv = np.full(k, mask, dtype=np.uint64)
+        mv = np.zeros(k, dtype=np.uint64)
+        score = np.full(k, m, dtype=np.int64)
+
+        for j in range(codigos.shape[1]):
+            ativo = tamanhos > j
+            eq = eq_matriz[:, j]
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            delta = (ph & last != 0).astype(np.int64) - (mh & last != 0).astype(np.int64)
+            score += np.where(ativo, delta, 0)
+            ph = ((ph << um) | um) & mask
+            mh = (mh << um) & mask
+            pv = np.where(ativo, mh | (~(xv | ph) & mask), pv)
+            mv = np.where(ativo, ph & xv, mv)
+
+        return score
 
     def similarity_score(self, s1: str, s2: str, max_dist: int = None) -> float:
         """
@@ -80,7 +210,29 @@ class LevenshteinMatcher:
         dist = self.levenshtein_distance(s1, s2, max_dist=max_dist)
         return 1.0 - (dist / max_len)
 
-    def _cache_distance(self, key: str, distance: int):
+    def similarity_scores(self, query: str, candidatos: List[str], max_dist=None) -> np.ndarray:
+        """
+        Versão em lote de similarity_score: uma query contra vários candidatos.
+
+        Args:
+            max_dist: Limite de early exit, escalar ou um valor por candidato
+        """
+        if not candidatos:
+            return np.empty(0, dtype=np.float64)
+
+        if len(candidatos) < self.BATCH_MIN_SIZE:
+            limites = np.broadcast_to(np.asarray(max_dist, dtype=object), (len(candidatos),))
+            return np.array([
+                self.similarity_score(query, c, max_dist=None if limite is None else int(limite))
+                for c, limite in zip(candidatos, limites)
+            ], dtype=np.float64)
+
+        empacotados = self.empacotar(candidatos)
+        distancias = self.distancias_em_lote(query, empacotados, max_dist=max_dist)
+        max_len = np.maximum(len(query), empacotados[1])
+        return np.where(max_len == 0, 1.0, 1.0 - distancias / np.maximum(max_len, 1))
+
+    def _cache_distance(self, key: tuple, distance: int):
         """Gerencia cache com limite automático"""
         if len(self.distance_cache) >= self.cache_size:
             # Remove 10% dos itens mais antigos
@@ -98,56 +250,253 @@ class LevenshteinMatcher:
 class DataManager:
     def __init__(self, excel_manager):
         self.excel_manager = excel_manager
-        self.rm_set = set()  # Cache de RMs únicos
-        self.nome_index = defaultdict(list)  # Índice invertido para nomes
+        self.rm_index = {}  # Índice hash: RM -> row_id
+        self.nome_index = defaultdict(set)  # Índice invertido: token -> row_ids
+        # row_id -> nome normalizado. Fonte única do texto normalizado: mantido a
+        # cada inclusão/edição/remoção e lido pela busca, similaridade e índices
+        self.nomes_normalizados = {}
+        self.trigram_index = TrigramIndex()  # Trigramas -> row_ids (busca por substring)
+        self._next_row_id = 0  # Próximo ID estável de linha (rótulo do índice do DataFrame)
+        self.versao = 0  # Incrementada a cada mudança nos dados (invalida buscas em andamento)
+        # Os comandos alteram os índices no thread pool enquanto a gravação os exporta
+        self._trava = threading.RLock()
         self.logger = logging.getLogger(__name__)
 
         # Matcher Levenshtein otimizado (5-10x mais rápido que SequenceMatcher)
         self.levenshtein_matcher = LevenshteinMatcher()
 
+        # Termos distintos (tokens e pares adjacentes) -> row_ids, para a busca fuzzy
+        self.fuzzy_index = FuzzyTokenIndex(self.levenshtein_matcher.similarity_scores)
+
         # Cache para buscas de nomes similares (evita recálculos)
 
         self.similarity_cache = {}
         self.SIMILARITY_CACHE_SIZE = 1000  # Limita tamanho do cache
 
+        # Persistência dos índices ao lado do .feather (evita retokenizar a cada abertura)
+        self.index_sidecar = IndexSidecar()
+
         self._build_indexes()
 
     def _build_indexes(self):
-        """Constrói índices otimizados para busca usando vetorização pandas"""
-        self.rm_set.clear()
+        """
+        Constrói os índices do zero (usado após carregar um arquivo).
+
+        Os índices são chaveados pelo rótulo do índice do DataFrame, que funciona
+        como ID estável da linha: nunca é renumerado nem reaproveitado, então
+        edições e remoções posteriores atualizam apenas as linhas afetadas.
+        """
+        self.rm_index.clear()
         self.nome_index.clear()
+        self.nomes_normalizados.clear()
+        self.trigram_index.limpar()
+        self.fuzzy_index.limpar()
         self.clear_cache()  # Invalida cache quando dados mudam
 
         if not hasattr(self.excel_manager, 'df') or self.excel_manager.df.empty:
+            self._next_row_id = 0
             return
 
-        # Preenche o conjunto de RMs (operação vetorizada)
-        self.rm_set.update(self.excel_manager.df['RM'].dropna().astype(int).unique())
+        df = self.excel_manager.df
+        self._next_row_id = int(df.index.max()) + 1
+
+        for row_id, nome, rm in zip(df.index, df['Nome do(a) Aluno(a)'], df['RM']):
+            self._index_name(row_id, nome)
+            self._index_rm(row_id, rm)
+
+    def carregar_indices(self, file_path: str) -> bool:
+        """
+        Carrega os índices do sidecar do arquivo ou, se ausente/obsoleto,
+        reconstrói do zero e grava um novo sidecar.
+
+        Returns:
+            True se os índices vieram do sidecar
+        """
+        indices = self.index_sidecar.carregar(file_path)
+        if indices is not None and self._importar_indices(indices):
+            self.logger.info(f"Índices carregados do sidecar de {file_path}")
+            return True
+
+        self._build_indexes()
+        self.salvar_indices(file_path)
+        return False
+
+    def salvar_indices(self, file_path: str, versao: Optional[int] = None) -> bool:
+        """
+        Regrava o sidecar de índices após o .feather ser salvo.
+
+        Args:
+            versao: `versao` dos dados na foto gravada (gravação em segundo plano).
+                Se um comando alterou os dados desde então, os índices não
+                correspondem mais ao arquivo e o sidecar não é gravado.
+        """
+        if not hasattr(self.excel_manager, 'df'):
+            return False
+        # A cópia é feita sob a trava; só a escrita em disco fica fora dela
+        with self._trava:
+            if versao is not None and versao != self.versao:
+                return False
+            indices = self._exportar_indices()
+        return self.index_sidecar.salvar(file_path, indices)
+
+    def _exportar_indices(self) -> Dict[str, Any]:
+        """
+        Copia os índices com os row_ids renumerados para a posição da linha,
+        que é o ID que cada linha recebe ao recarregar o arquivo salvo.
+        Chamado sob self._trava: a cópia não compartilha dicts nem sets com os índices vivos.
+        """
+        df = self.excel_manager.df
+        if df.index.equals(pd.RangeIndex(len(df))):
+            # Sem remoções desde o carregamento: os IDs já são as posições
+            def posicao(row_id):
+                return row_id
+        else:
+            posicao = {row_id: pos for pos, row_id in enumerate(df.index)}.__getitem__
+
+        def remapear(postings):
+            return {chave: {posicao(row_id) for row_id in row_ids} for chave, row_ids in postings.items()}
+
+        return {
+            'nomes_normalizados': {
+                posicao(row_id): nome for row_id, nome in self.nomes_normalizados.items()
+            },
+            'nome_index': remapear(self.nome_index),
+            'rm_index': {rm: posicao(row_id) for rm, row_id in self.rm_index.items()},
+            'trigramas': remapear(self.trigram_index.postings),
+            'fuzzy': {
+                'postings': remapear(self.fuzzy_index.postings),
+                'qgramas': {qgrama: set(termos) for qgrama, termos in self.fuzzy_index.qgramas.items()},
+                'por_tamanho': {tamanho: set(termos) for tamanho, termos in self.fuzzy_index.por_tamanho.items()}
+            }
+        }
 
-        # Cria índice invertido para nomes usando apply (mais rápido que iterrows)
-        def extract_tokens(nome, idx):
-            """Extrai tokens do nome para indexação"""
-            nome_normalizado = remove_acentos(str(nome)).lower()
-            tokens = nome_normalizado.split()[:3]
-            return [(token, idx, nome_normalizado) for token in tokens if len(token) > 2]
+    def _importar_indices(self, indices: Dict[str, Any]) -> bool:
+        """Substitui os índices em memória pelos lidos do sidecar"""
+        df = getattr(self.excel_manager, 'df', None)
+        try:
+            nomes_normalizados = indices['nomes_normalizados']
+            nome_index = indices['nome_index']
+            rm_index = indices['rm_index']
+            trigramas = indices['trigramas']
+            fuzzy = indices['fuzzy']
+        except (KeyError, TypeError):
+            return False
+        if df is None or len(nomes_normalizados) != len(df):
+            return False
 
-        # Aplicação vetorizada em vez de iterrows (10-100x mais rápido)
-        for idx, nome in enumerate(self.excel_manager.df['Nome do(a) Aluno(a)']):
-            tokens_data = extract_tokens(nome, idx)
-            for token, token_idx, nome_norm in tokens_data:
-                self.nome_index[token].append((token_idx, nome_norm))
+        self.clear_cache()
+        self.nomes_normalizados = nomes_normalizados
+        self.nome_index = defaultdict(set, nome_index)
+        self.rm_index = rm_index
+        self.trigram_index.postings = defaultdict(set, trigramas)
+        self.fuzzy_index.postings = defaultdict(set, fuzzy['postings'])
+        self.fuzzy_index.qgramas = defaultdict(set, fuzzy['qgramas'])
+        self.fuzzy_index.por_tamanho = defaultdict(set, fuzzy['por_tamanho'])
+        self._next_row_id = int(df.index.max()) + 1 if not df.empty else 0
+        self.versao += 1
+        return True
+
+    def _index_name(self, row_id, nome):
+        """Adiciona os postings de uma única linha ao índice de nomes"""
+        nome_normalizado = normalizar_texto(nome)
+        self.nomes_normalizados[row_id] = nome_normalizado
+        self.trigram_index.adicionar(row_id, nome_normalizado)
+        self.fuzzy_index.adicionar(row_id, nome_normalizado)
+        for token in self._tokens_indexaveis(nome_normalizado):
+            self.nome_index[token].add(row_id)
+
+    def _unindex_name(self, row_id):
+        """Remove os postings de uma única linha do índice de nomes"""
+        nome_normalizado = self.nomes_normalizados.pop(row_id, None)
+        if nome_normalizado is None:
+            return
+        self.trigram_index.remover(row_id, nome_normalizado)
+        self.fuzzy_index.remover(row_id, nome_normalizado)
+        for token in self._tokens_indexaveis(nome_normalizado):
+            postings = self.nome_index.get(token)
+            if postings is None:
+                continue
+            postings.discard(row_id)
+            if not postings:
+                del self.nome_index[token]
+
+    def _index_rm(self, row_id, rm):
+        """Registra o RM da linha no índice hash"""
+        if not pd.isna(rm):
+            self.rm_index[int(rm)] = row_id
+
+    def _unindex_rm(self, row_id, rm):
+        """Remove o RM do índice hash, se ainda apontar para esta linha"""
+        if not pd.isna(rm) and self.rm_index.get(int(rm)) == row_id:
+            del self.rm_index[int(rm)]
+
+    @staticmethod
+    def _tokens_indexaveis(nome_normalizado: str) -> List[str]:
+        """Tokens usados no índice invertido (três primeiros, ignorando artigos)"""
+        return [t for t in nome_normalizado.split()[:3] if len(t) > 2]
+
+    def _invalidate_similarity_cache(self):
+        """Invalida apenas resultados dependentes dos dados.
+
+        O cache de distâncias do Levenshtein depende só das strings comparadas,
+        então continua válido após mutações.
+        """
+        self.versao += 1
+        self.similarity_cache.clear()
 
     def rm_existe(self, rm) -> bool:
         """Verificação otimizada de existência de RM"""
-        return int(rm) in self.rm_set
+        return int(rm) in self.rm_index
+
+    def get_row_id_por_rm(self, rm) -> Optional[int]:
+        """Retorna o ID estável da linha do aluno com o RM dado (O(1))"""
+        try:
+            return self.rm_index.get(int(rm))
+        except (TypeError, ValueError):
+            return None
 
     def get_aluno_por_rm(self, rm) -> Optional[Dict[str, Any]]:
         """Obtém aluno por RM com tratamento de erro"""
+        row_id = self.get_row_id_por_rm(rm)
+        if row_id is None:
+            return None
         try:
-            aluno = self.excel_manager.df[self.excel_manager.df['RM'] == int(rm)].iloc[0]
-            return aluno.to_dict()
-        except (IndexError, KeyError, ValueError):
+            return self.excel_manager.df.loc[row_id].to_dict()
+        except KeyError:
+            return None
+
+    def get_nome_por_rm(self, rm) -> Optional[str]:
+        """Obtém apenas o nome do aluno pelo RM (evita materializar a linha inteira)"""
+        row_id = self.get_row_id_por_rm(rm)
+        if row_id is None:
             return None
+        return self.excel_manager.df.at[row_id, 'Nome do(a) Aluno(a)']
+
+    def get_nomes_por_rms(self, rms: np.ndarray) -> np.ndarray:
+        """
+        Nome do aluno de cada RM (None se não existir), com uma única junção
+        hash contra a coluna RM em vez de uma consulta por RM.
+        """
+        df = getattr(self.excel_manager, 'df', None)
+        nomes = np.full(len(rms), None, dtype=object)
+        if df is None or df.empty or len(rms) == 0:
+            return nomes
+
+        # Como no rm_index, um RM repetido no cadastro aponta para a última linha
+        if not df['RM'].is_unique:
+            df = df.drop_duplicates('RM', keep='last')
+        posicoes = pd.Index(df['RM']).get_indexer(rms)
+        encontrados = posicoes >= 0
+        nomes[encontrados] = df['Nome do(a) Aluno(a)'].to_numpy(dtype=object)[posicoes[encontrados]]
+        return nomes
+
+    def get_alunos_por_rms(self, rms) -> pd.DataFrame:
+        """Retorna as linhas (com seus IDs) dos RMs informados, via índice hash"""
+        row_ids = [
+            row_id for row_id in (self.get_row_id_por_rm(rm) for rm in rms)
+            if row_id is not None
+        ]
+        return self.excel_manager.df.loc[row_ids]
 
     def adicionar_aluno(self, nome: str, rm: int) -> bool:
         """Adiciona aluno com validação e atualização de índices - otimizado"""
@@ -161,16 +510,20 @@ class DataManager:
         except Exception:
             return False
 
-        # Usa .loc[] que é mais eficiente que pd.concat() para uma única linha
-        new_index = len(self.excel_manager.df)
-        self.excel_manager.df.loc[new_index] = [sobrenome, nome_formatado, rm_int]
-
-        # Reconstrói índices apenas com a nova linha (mais eficiente)
-        nome_normalizado = remove_acentos(nome_formatado).lower()
-        tokens = nome_normalizado.split()[:3]
-        for token in (t for t in tokens if len(t) > 2):
-            self.nome_index[token].append((new_index, nome_normalizado))
-        self.rm_set.add(rm_int)
+        with self._trava:
+            # Anexa com um ID novo (nunca reaproveitado) para a linha
+            new_index = self._next_row_id
+            self._next_row_id += 1
+            self.excel_manager.anexar_linhas(pd.DataFrame({
+                'Sobrenome': [sobrenome],
+                'Nome do(a) Aluno(a)': [nome_formatado],
+                'RM': [rm_int]
+            }, index=[new_index]))
+
+            # Atualiza índices apenas com a nova linha
+            self._index_name(new_index, nome_formatado)
+            self._index_rm(new_index, rm_int)
+            self._invalidate_similarity_cache()
 
         return True
 
@@ -193,7 +546,6 @@ class DataManager:
             sobrenomes = []
             nomes_formatados = []
             rms = []
-            indices_novos = []
 
             for nome, rm in alunos:
                 nome_fmt = formatar_nome(nome)
@@ -203,25 +555,27 @@ class DataManager:
                 sobrenomes.append(sobrenome)
                 nomes_formatados.append(nome_fmt)
                 rms.append(rm_int)
-                indices_novos.append(len(self.excel_manager.df) + len(sobrenomes) - 1)
-
-            # Cria DataFrame com novo batch e concatena uma única vez
-            new_rows = pd.DataFrame({
-                'Sobrenome': sobrenomes,
-                'Nome do(a) Aluno(a)': nomes_formatados,
-                'RM': rms
-            })
-
-            self.excel_manager.df = pd.concat([self.excel_manager.df, new_rows], ignore_index=True)
-
-            # Atualiza índices em batch
-            for idx, (nome_fmt, rm_int) in enumerate(zip(nomes_formatados, rms)):
-                new_index = len(self.excel_manager.df) - len(alunos) + idx
-                nome_normalizado = remove_acentos(nome_fmt).lower()
-                tokens = nome_normalizado.split()[:3]
-                for token in (t for t in tokens if len(t) > 2):
-                    self.nome_index[token].append((new_index, nome_normalizado))
-                self.rm_set.add(rm_int)
+
+            with self._trava:
+                # Reserva IDs estáveis para o lote inteiro
+                inicio = self._next_row_id
+                indices_novos = range(inicio, inicio + len(rms))
+
+                # Cria DataFrame com novo batch e concatena uma única vez
+                new_rows = pd.DataFrame({
+                    'Sobrenome': sobrenomes,
+                    'Nome do(a) Aluno(a)': nomes_formatados,
+                    'RM': rms
+                }, index=indices_novos)
+
+                self.excel_manager.anexar_linhas(new_rows)
+                self._next_row_id = inicio + len(rms)
+
+                # Atualiza índices em batch
+                for new_index, nome_fmt, rm_int in zip(indices_novos, nomes_formatados, rms):
+                    self._index_name(new_index, nome_fmt)
+                    self._index_rm(new_index, rm_int)
+                self._invalidate_similarity_cache()
             return len(alunos)
         except Exception as e:
             self.logger.error(f"Erro ao adicionar alunos em lote: {str(e)}")
@@ -238,7 +592,7 @@ class DataManager:
         Returns:
             Dict com resultado da busca e score de similaridade
         """
-        nome_novo_normalizado = remove_acentos(nome_novo.lower())
+        nome_novo_normalizado = normalizar_texto(nome_novo)
         cache_key = f"{nome_novo_normalizado}_{threshold}"
 
         # Verifica cache
@@ -250,8 +604,7 @@ class DataManager:
         # Busca candidatos usando o índice invertido
         candidatos = set()
         for token in tokens_relevantes:
-            for idx, nome_existente in self.nome_index.get(token, []):
-                candidatos.add((idx, nome_existente))
+            candidatos.update(self.nome_index.get(token, ()))
 
         if not candidatos:
             result = {'similar': False, 'nome_existente': None, 'rm_existente': None, 'similarity': 0}
@@ -259,27 +612,32 @@ class DataManager:
             return result
 
         melhor_match = None
-        melhor_similaridade = threshold
-
-        for idx, nome_existente_normalizado in candidatos:
-            # Early exit: se diferença de tamanho é grande, pula
-            if abs(len(nome_novo_normalizado) - len(nome_existente_normalizado)) > 10:
-                continue
 
-            # Usa Levenshtein com early exit se já excedeu threshold
-            max_dist = int((1.0 - threshold) * max(len(nome_novo_normalizado), len(nome_existente_normalizado)))
-            similarity = self.levenshtein_matcher.similarity_score(
-                nome_novo_normalizado,
-                nome_existente_normalizado,
-                max_dist=max_dist  # ✅ Agora o early exit é aproveitado
+        # Early exit: se diferença de tamanho é grande, pula
+        row_ids = []
+        nomes = []
+        for row_id in candidatos:
+            nome_existente_normalizado = self.nomes_normalizados[row_id]
+            if abs(len(nome_novo_normalizado) - len(nome_existente_normalizado)) <= 10:
+                row_ids.append(row_id)
+                nomes.append(nome_existente_normalizado)
+
+        if nomes:
+            # Todos os candidatos em uma chamada, com limite de distância por candidato
+            max_lens = np.maximum(len(nome_novo_normalizado), [len(n) for n in nomes])
+            max_dists = ((1.0 - threshold) * max_lens).astype(np.int64)
+            scores = self.levenshtein_matcher.similarity_scores(
+                nome_novo_normalizado, nomes, max_dist=max_dists
             )
 
-            if similarity > melhor_similaridade:
-                melhor_similaridade = similarity
+            melhor = int(np.argmax(scores))
+            if scores[melhor] > threshold:
+                df = self.excel_manager.df
+                row_id = row_ids[melhor]
                 melhor_match = {
-                    'nome_existente': self.excel_manager.df.iloc[idx]['Nome do(a) Aluno(a)'],
-                    'rm_existente': self.excel_manager.df.iloc[idx]['RM'],
-                    'similarity': similarity
+                    'nome_existente': df.at[row_id, 'Nome do(a) Aluno(a)'],
+                    'rm_existente': df.at[row_id, 'RM'],
+                    'similarity': float(scores[melhor])
                 }
 
         result = melhor_match if melhor_match else {'similar': False, 'nome_existente': None, 'rm_existente': None, 'similarity': 0}
@@ -301,6 +659,7 @@ class DataManager:
 
     def clear_cache(self):
         """Limpa cache quando dados são modificados"""
+        self.versao += 1
         self.similarity_cache.clear()
         self.levenshtein_matcher.clear_cache()
         self.logger.debug("Cache de similaridade e Levenshtein limpo")
@@ -328,9 +687,9 @@ class DataManager:
             rms_vistos.add(rm_int)
 
             # Check for existing RM in database
-            if self.rm_existe(rm_int):
-                aluno_existente = self.get_aluno_por_rm(rm_int)
-                rms_duplicados.append((rm_int, aluno_existente['Nome do(a) Aluno(a)'] if aluno_existente else ""))
+            nome_existente = self.get_nome_por_rm(rm_int)
+            if nome_existente is not None:
+                rms_duplicados.append((rm_int, nome_existente))
                 continue
 
             # Check for similar names
@@ -361,12 +720,74 @@ class DataManager:
 
         try:
             rms_para_remover = {int(aluno['RM']) for aluno in alunos}
-            original_size = len(self.excel_manager.df)
-            self.excel_manager.df = self.excel_manager.df[~self.excel_manager.df['RM'].isin(rms_para_remover)].reset_index(drop=True)
-            if len(self.excel_manager.df) == original_size:
-                return False
-            self._build_indexes()
+            with self._trava:
+                removidos = self.get_alunos_por_rms(rms_para_remover)
+                if removidos.empty:
+                    return False
+
+                # Sem reset_index: os IDs das linhas restantes continuam válidos
+                self.excel_manager.remover_linhas(removidos.index)
+                for row_id, rm in zip(removidos.index, removidos['RM']):
+                    self._unindex_name(row_id)
+                    self._unindex_rm(row_id, rm)
+                self._invalidate_similarity_cache()
             return True
         except Exception as e:
-            print(f"Erro ao remover alunos: {e}")
-            return False
\ No newline at end of file
+            self.logger.error(f"Erro ao remover alunos: {e}")
+            return False
+
+    def restaurar_alunos(self, linhas: pd.DataFrame) -> bool:
+        """
+        Reinsere linhas removidas anteriormente, preservando seus IDs (usado no undo).
+
+        Args:
+            linhas: DataFrame com as linhas removidas, indexado pelos IDs originais
+
+        Returns:
+            True se alguma linha foi restaurada
+        """
+        if linhas is None or linhas.empty or not hasattr(self.excel_manager, 'df'):
+            return False
+
+        with self._trava:
+            df = self.excel_manager.df
+            novas = linhas[~linhas.index.isin(df.index)]
+            if novas.empty:
+                return False
+
+            self.excel_manager.anexar_linhas(novas)
+            for row_id, nome, rm in zip(novas.index, novas['Nome do(a) Aluno(a)'], novas['RM']):
+                self._index_name(row_id, nome)
+                self._index_rm(row_id, rm)
+            self._next_row_id = max(self._next_row_id, int(novas.index.max()) + 1)
+            self._invalidate_similarity_cache()
+        return True
+
+    def editar_campo(self, row_id, col: int, valor) -> bool:
+        """
+        Altera uma célula do aluno identificado por row_id e atualiza os
+        índices somente dessa linha.
+
+        Args:
+            row_id: ID estável da linha (rótulo do índice do DataFrame)
+            col: Posição da coluna (0 = Sobrenome, 1 = Nome, 2 = RM)
+            valor: Novo valor da célula
+        """
+        with self._trava:
+            df = self.excel_manager.df
+            if row_id not in df.index:
+                return False
+
+            coluna = df.columns[col]
+            valor_antigo = df.at[row_id, coluna]
+            self.excel_manager.definir_valor(row_id, coluna, valor)
+
+            if coluna == 'RM':
+                self._unindex_rm(row_id, valor_antigo)
+                self._index_rm(row_id, valor)
+            elif coluna == 'Nome do(a) Aluno(a)':
+                self._unindex_name(row_id)
+                self._index_name(row_id, valor)
+
+            self._invalidate_similarity_cache()
+        return True
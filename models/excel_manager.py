@@ -1,12 +1,39 @@
+import os
+import logging
+import threading
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
 from pathlib import Path
+from typing import Dict, Optional
+from models.config_manager import ConfigManager
+from models.change_journal import ChangeJournal
 
 class ExcelManager:
-    def __init__(self):
+    # Mapeia o arquivo em vez de lê-lo para a memória: colunas de um Feather sem
+    # compressão ficam zero-copy. No Windows um arquivo mapeado não pode ser
+    # substituído ao salvar, então lá o arquivo é lido de uma vez.
+    MAPEAR_ARQUIVO = os.name != 'nt'
+    # Acima deste tamanho o diário de alterações é incorporado ao .feather
+    DIARIO_MAX_BYTES = 1024 * 1024
+    # Linhas por lote ao gravar (cada lote concluído avança o progresso)
+    LINHAS_POR_LOTE = 64 * 1024
+
+    def __init__(self, compact: Optional[bool] = None):
         # Ordem padronizada das colunas
         self.columns = ['Sobrenome', 'Nome do(a) Aluno(a)', 'RM']
         self.df = pd.DataFrame(columns=self.columns)
         self.current_path = None
+        # Modo compacto: sobrenomes categóricos, nomes em strings Arrow e RM int64
+        self.compact = ConfigManager().get_compact_storage() if compact is None else compact
+        # Alterações por linha ainda não gravadas no diário (os comandos rodam fora da GUI)
+        self.journal = ChangeJournal()
+        self._alteracoes = []
+        self._em_gravacao = []  # Alterações contidas na foto que está sendo gravada
+        self._salvando = False
+        self._trava = threading.RLock()
+        self.logger = logging.getLogger(__name__)
 
     def load_excel(self, file_path: str) -> bool:
         """Carrega dados de um arquivo Feather"""
@@ -16,16 +43,20 @@ class ExcelManager:
                 print(f"Arquivo não encontrado: {file_path}")
                 return False
 
-            # Carrega arquivo Feather
-            self.df = pd.read_feather(file_path)
-
-            # Garante as três colunas e ordem correta
-            for col in self.columns:
-                if col not in self.df.columns:
-                    self.df[col] = ""
-            self.df = self.df[self.columns]
-            self._preprocess_data()
+            # Tabela Arrow sem cópia; cada coluna só é convertida se o tipo exigir
+            tabela = feather.read_table(file_path, memory_map=self.MAPEAR_ARQUIVO)
+            self.df = self._montar_dataframe(tabela)
             self.current_path = file_path
+            with self._trava:
+                self._alteracoes = []
+
+            # Diário que sobrou de uma sessão sem compactação: reaplica e incorpora
+            entradas = self.journal.ler(file_path)
+            if entradas:
+                self._aplicar_diario(entradas)
+                self.df = self.df.reset_index(drop=True)
+                self.logger.info(f"Diário de alterações reaplicado ({len(entradas)} entradas)")
+                self.save_excel(file_path)
             return True
         except Exception as e:
             print(f"Erro ao carregar arquivo: {e}")
@@ -38,23 +69,281 @@ class ExcelManager:
             print("Nenhum caminho de arquivo especificado para salvar.")
             return False
 
+        foto = self.iniciar_gravacao()
+        sucesso = self.gravar_arquivo(foto, path)
+        self.concluir_gravacao(path, sucesso)
+        return sucesso
+
+    def iniciar_gravacao(self) -> pd.DataFrame:
+        """
+        Tira uma foto do DataFrame para gravar em segundo plano. Com copy-on-write
+        a foto não copia nada agora: só as colunas alteradas depois são copiadas.
+        Até concluir_gravacao, as novas alterações ficam na fila em memória.
+        """
+        with self._trava:
+            self._salvando = True
+            self._em_gravacao, self._alteracoes = self._alteracoes, []
+            # Os rótulos do índice são IDs de linha em memória; não vão para o arquivo
+            return self.df.reset_index(drop=True)
+
+    def gravar_arquivo(self, foto: pd.DataFrame, file_path: str, progresso=None) -> bool:
+        """
+        Grava a foto em um arquivo temporário, força a escrita no disco e troca
+        pelo arquivo final (uma queda no meio nunca deixa o .feather truncado).
+
+        Args:
+            foto: DataFrame retornado por iniciar_gravacao
+            file_path: Caminho do .feather
+            progresso: Função opcional chamada com a fração já gravada (0 a 1)
+        """
+        tmp_path = f"{file_path}.tmp"
         try:
-            self.df.to_feather(path)
-            self.current_path = path
+            # Sem compressão, para a próxima carga mapear as colunas sem copiá-las
+            tabela = pa.Table.from_pandas(foto, preserve_index=False)
+            opcoes = pa.ipc.IpcWriteOptions(compression=None)
+            total = max(tabela.num_rows, 1)
+            with pa.OSFile(tmp_path, 'wb') as destino:
+                with pa.ipc.new_file(destino, tabela.schema, options=opcoes) as escritor:
+                    for inicio in range(0, tabela.num_rows, self.LINHAS_POR_LOTE):
+                        escritor.write_table(tabela.slice(inicio, self.LINHAS_POR_LOTE))
+                        if progresso:
+                            progresso(min(inicio + self.LINHAS_POR_LOTE, total) / total)
+            with open(tmp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+            # Grava ao lado e troca: o arquivo atual pode estar mapeado pelo próprio df
+            os.replace(tmp_path, file_path)
+            # O .feather já contém a foto; o diário só é apagado depois da troca
+            self.journal.descartar(file_path)
             return True
         except Exception as e:
             print(f"Erro ao salvar arquivo: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def concluir_gravacao(self, file_path: str, sucesso: bool):
+        """Encerra a gravação; se falhou, as alterações da foto voltam para a fila do diário"""
+        with self._trava:
+            if not sucesso:
+                self._alteracoes = self._em_gravacao + self._alteracoes
+            else:
+                self.current_path = file_path
+            self._em_gravacao = []
+            self._salvando = False
+
+    def gravar_diario(self, file_path: str = None) -> bool:
+        """
+        Acrescenta ao diário do arquivo as alterações feitas desde a última
+        gravação. O custo depende do tamanho da alteração, não do cadastro.
+        """
+        path = file_path or self.current_path
+        if not path or not os.path.exists(path):
             return False
 
-    def _preprocess_data(self):
-        """Garante tipos de dados consistentes e remove linhas inválidas"""
-        # Garante que as colunas existem antes de operar
+        with self._trava:
+            if self._salvando:
+                # O diário atual será apagado pela gravação; a fila vai para o próximo
+                return True
+            entradas, self._alteracoes = self._alteracoes, []
+        if not entradas or self.journal.anexar(path, entradas):
+            return True
+
+        # Mantém as entradas para a próxima tentativa (ou para o save completo)
+        with self._trava:
+            self._alteracoes = entradas + self._alteracoes
+        return False
+
+    def diario_excede_limite(self, file_path: str = None) -> bool:
+        """Indica se o diário já está grande o bastante para ser compactado"""
+        path = file_path or self.current_path
+        if self._salvando or not path:
+            return False
+        return self.journal.tamanho(path) >= self.DIARIO_MAX_BYTES
+
+    def tem_diario(self, file_path: str = None) -> bool:
+        """Indica se há alterações no diário (ou pendentes) ainda fora do .feather"""
+        path = file_path or self.current_path
+        return bool(self._alteracoes) or (bool(path) and self.journal.tamanho(path) > 0)
+
+    def anexar_linhas(self, novas: pd.DataFrame):
+        """Concatena novas linhas (com seus IDs) mantendo os tipos do modo de armazenamento"""
+        with self._trava:
+            self.df = self._concatenar(novas[self.columns])
+            self._alteracoes.append({'op': 'add', 'linhas': [
+                [sobrenome, nome, int(rm)]
+                for sobrenome, nome, rm in zip(novas['Sobrenome'], novas['Nome do(a) Aluno(a)'], novas['RM'])
+            ]})
+
+    def remover_linhas(self, row_ids):
+        """Remove linhas pelos IDs, sem renumerar as restantes"""
+        with self._trava:
+            rms = self.df.loc[row_ids, 'RM']
+            self.df = self.df.drop(index=row_ids)
+            self._alteracoes.append({'op': 'del', 'rms': [int(rm) for rm in rms]})
+
+    def definir_valor(self, row_id, coluna: str, valor):
+        """Altera uma célula; em colunas categóricas registra antes a categoria nova"""
+        # A alteração e sua entrada no diário entram juntas (ou nenhuma) na foto de uma gravação
+        with self._trava:
+            rm = self.df.at[row_id, 'RM']
+            self._definir(row_id, coluna, valor)
+            self._alteracoes.append({'op': 'set', 'rm': int(rm), 'coluna': coluna, 'valor': self._valor_json(valor)})
+
+    def _definir(self, row_id, coluna: str, valor):
+        serie = self.df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+            # union() mantém as categorias ordenadas, então a ordenação continua alfabética
+            self.df[coluna] = serie.cat.set_categories(serie.cat.categories.union([valor]))
+        self.df.at[row_id, coluna] = valor
+
+    @staticmethod
+    def _valor_json(valor):
+        # Escalares numpy (ex.: np.int64) não são serializáveis em JSON
+        return valor.item() if isinstance(valor, np.generic) else valor
+
+    def _aplicar_diario(self, entradas):
+        """
+        Reaplica as entradas do diário sobre o DataFrame recém-carregado. As
+        linhas são localizadas pelo RM; remoções e inclusões são acumuladas e
+        aplicadas de uma vez no fim.
+        """
+        df = self.df
+        linha_por_rm = dict(zip(df['RM'].tolist(), df.index))
+        proximo_id = int(df.index.max()) + 1 if len(df) else 0
+        removidas = []
+        novas = {}  # ID -> [Sobrenome, Nome, RM] das linhas incluídas pelo diário
+        colunas = {col: i for i, col in enumerate(self.columns)}
+
+        for entrada in entradas:
+            op = entrada.get('op')
+            if op == 'add':
+                for linha in entrada['linhas']:
+                    novas[proximo_id] = list(linha)
+                    linha_por_rm[linha[2]] = proximo_id
+                    proximo_id += 1
+            elif op == 'del':
+                for rm in entrada['rms']:
+                    row_id = linha_por_rm.pop(rm, None)
+                    if row_id is None:
+                        continue
+                    if novas.pop(row_id, None) is None:
+                        removidas.append(row_id)
+            elif op == 'set':
+                row_id = linha_por_rm.get(entrada['rm'])
+                if row_id is None:
+                    continue
+                coluna, valor = entrada['coluna'], entrada['valor']
+                if row_id in novas:
+                    novas[row_id][colunas[coluna]] = valor
+                else:
+                    self._definir(row_id, coluna, valor)
+                if coluna == 'RM':
+                    del linha_por_rm[entrada['rm']]
+                    linha_por_rm[valor] = row_id
+
+        if removidas:
+            self.df = self.df.drop(index=removidas)
+        if novas:
+            linhas = pd.DataFrame(list(novas.values()), index=list(novas.keys()), columns=self.columns)
+            self.df = self._concatenar(linhas)
+
+    def uso_memoria(self) -> Dict[str, int]:
+        """Bytes ocupados por coluna (incluindo o conteúdo das strings), índice e total"""
+        uso = self.df.memory_usage(deep=True)
+        relatorio = {col: int(uso[col]) for col in self.columns}
+        relatorio['indice'] = int(uso['Index'])
+        relatorio['total'] = int(uso.sum())
+        return relatorio
+
+    def _concatenar(self, novas: pd.DataFrame) -> pd.DataFrame:
+        """
+        Concatena linhas novas ao DataFrame. No modo compacto só as novas são
+        convertidas para os tipos atuais (categorias novas entram antes), sem
+        reconverter o DataFrame inteiro a cada inclusão.
+        """
+        df = self.df
+        sobrenomes = df['Sobrenome']
+        compacto = (isinstance(sobrenomes.dtype, pd.CategoricalDtype)
+                    and df['Nome do(a) Aluno(a)'].dtype == 'string[pyarrow]')
+        if not self.compact or not compacto or (df['RM'].dtype == 'int64' and novas['RM'].isna().any()):
+            return self._aplicar_tipos(pd.concat([df, novas]))
+
+        faltando = pd.Index(novas['Sobrenome'].dropna().unique()).difference(sobrenomes.cat.categories)
+        if len(faltando):
+            # union() mantém as categorias ordenadas, como em _definir
+            df = df.copy(deep=False)
+            df['Sobrenome'] = sobrenomes.cat.set_categories(sobrenomes.cat.categories.union(faltando))
+        return pd.concat([df, novas.astype(df.dtypes.to_dict())])
+
+    def _aplicar_tipos(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte para o layout compacto (no modo padrão o DataFrame não é alterado)"""
+        if not self.compact:
+            return df
+        df = df.copy(deep=False)
+        # Sobrenomes se repetem muito: cada linha guarda só o código da categoria
+        df['Sobrenome'] = df['Sobrenome'].astype('category')
+        df['Nome do(a) Aluno(a)'] = df['Nome do(a) Aluno(a)'].astype('string[pyarrow]')
+        if not df['RM'].isna().any():
+            df['RM'] = df['RM'].astype('int64')
+        return df
+
+    def _montar_dataframe(self, tabela: pa.Table) -> pd.DataFrame:
+        """
+        Monta o DataFrame a partir da tabela Arrow garantindo as três colunas, na
+        ordem, com tipos consistentes e sem linhas inválidas. Colunas que já têm
+        o tipo certo são só embrulhadas (sem cópia).
+        """
+        colunas = {}
         for col in self.columns:
-            if col not in self.df.columns:
-                self.df[col] = ""
-        # Normaliza tipos
-        self.df['RM'] = pd.to_numeric(self.df['RM'], errors='coerce').astype('Int64')
-        self.df['Nome do(a) Aluno(a)'] = self.df['Nome do(a) Aluno(a)'].astype(str)
-        self.df['Sobrenome'] = self.df['Sobrenome'].astype(str)
-        # Remove linhas sem nome ou RM
-        self.df = self.df.dropna(subset=['Nome do(a) Aluno(a)', 'RM'])
\ No newline at end of file
+            if col in tabela.column_names:
+                colunas[col] = tabela.column(col)
+            else:
+                colunas[col] = pa.chunked_array([pa.array([""] * tabela.num_rows, type=pa.string())])
+
+        df = pd.DataFrame({
+            'Sobrenome': self._coluna_texto(colunas['Sobrenome'], categorica=self.compact),
+            'Nome do(a) Aluno(a)': self._coluna_texto(colunas['Nome do(a) Aluno(a)']),
+            'RM': self._coluna_rm(colunas['RM'])
+        }, copy=False)
+
+        # Remove linhas sem nome ou RM; o índice volta a ser a posição da linha,
+        # que é o ID estável usado pelos índices (e pelo sidecar) do DataManager
+        invalidas = df['Nome do(a) Aluno(a)'].isna() | df['RM'].isna()
+        if invalidas.any():
+            df = df[~invalidas].reset_index(drop=True)
+        if self.compact and df['RM'].dtype != 'int64':
+            df['RM'] = df['RM'].astype('int64')
+        return df
+
+    def _coluna_texto(self, coluna: pa.ChunkedArray, categorica: bool = False) -> pd.Series:
+        """Coluna de texto: strings Arrow no modo compacto (sem cópia) ou str no padrão"""
+        if pa.types.is_dictionary(coluna.type):
+            # Feather salvo no modo compacto: já vem categórico
+            serie = coluna.to_pandas()
+            if not categorica:
+                return serie.astype(str)
+            if not serie.cat.categories.is_monotonic_increasing:
+                serie = serie.cat.reorder_categories(serie.cat.categories.sort_values())
+            return serie
+
+        if pa.types.is_string(coluna.type) or pa.types.is_large_string(coluna.type):
+            if self.compact and not categorica:
+                serie = pd.Series(pd.StringDtype('pyarrow').__from_arrow__(coluna))
+            else:
+                serie = coluna.to_pandas()
+        else:
+            serie = coluna.to_pandas().astype(str)
+            if self.compact:
+                serie = serie.astype('string[pyarrow]')
+
+        # Sobrenomes se repetem muito: cada linha guarda só o código da categoria
+        return serie.astype('category') if categorica else serie
+
+    def _coluna_rm(self, coluna: pa.ChunkedArray) -> pd.Series:
+        """RM como inteiro: int64 direto do Arrow quando não há nulos, senão Int64"""
+        if pa.types.is_integer(coluna.type) and coluna.null_count == 0:
+            valores = coluna.to_numpy().astype(np.int64, copy=False)
+            return pd.Series(valores if self.compact else pd.array(valores, dtype='Int64'))
+        return pd.to_numeric(coluna.to_pandas(), errors='coerce').astype('Int64')
\ No newline at end of file
@@ -5,15 +5,19 @@ class FileLoaderThread(QThread):
     finished = pyqtSignal(bool, str) # success, file_path
     progress = pyqtSignal(int) # progress percentage
 
-    def __init__(self, excel_manager, file_path):
+    def __init__(self, excel_manager, file_path, data_manager=None):
         super().__init__()
         self.excel_manager = excel_manager
         self.file_path = file_path
+        self.data_manager = data_manager
         self.logger = logging.getLogger(__name__)
 
     def run(self):
         try:
             success = self.excel_manager.load_excel(self.file_path)
+            if success and self.data_manager is not None:
+                # Índices vêm do sidecar ou são construídos aqui, fora da thread da GUI
+                self.data_manager.carregar_indices(self.file_path)
             self.finished.emit(success, self.file_path)
         except Exception as e:
             self.logger.error("Erro no carregamento", exc_info=True)
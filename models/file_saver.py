@@ -0,0 +1,49 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+import logging
+
+class FileSaverThread(QThread):
+    """
+    Grava o arquivo fora da thread da GUI: backup, escrita da foto do DataFrame
+    (temporário + fsync + troca atômica) e sidecar de índices. Comandos
+    executados durante a gravação não esperam por ela.
+    """
+    finished = pyqtSignal(bool, str) # success, file_path
+    progress = pyqtSignal(int) # progress percentage
+
+    def __init__(self, excel_manager, file_path, foto, data_manager=None, versao=None, backup=None):
+        super().__init__()
+        self.excel_manager = excel_manager
+        self.file_path = file_path
+        self.foto = foto
+        self.data_manager = data_manager
+        self.versao = versao
+        self.backup = backup
+        self.backup_ok = True
+        self.success = False
+        self.logger = logging.getLogger(__name__)
+
+    def run(self):
+        try:
+            if self.backup is not None:
+                self.backup_ok = self.backup(self.file_path)
+            self.progress.emit(10)
+
+            self.success = self.excel_manager.gravar_arquivo(
+                self.foto, self.file_path,
+                progresso=lambda fracao: self.progress.emit(10 + int(fracao * 80))
+            )
+        except Exception:
+            self.logger.error("Erro na gravação", exc_info=True)
+            self.success = False
+        finally:
+            self.foto = None
+
+        # O .feather já foi trocado e o diário apagado: uma falha no sidecar só
+        # faz os índices serem reconstruídos na próxima abertura
+        if self.success and self.data_manager is not None:
+            try:
+                self.data_manager.salvar_indices(self.file_path, versao=self.versao)
+            except Exception:
+                self.logger.warning("Falha ao gravar sidecar de índices", exc_info=True)
+        self.progress.emit(100)
+        self.finished.emit(self.success, self.file_path)
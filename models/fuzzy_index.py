@@ -0,0 +1,147 @@
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Sequence, Set
+
+import numpy as np
+
+
+class FuzzyTokenIndex:
+    """
+    Índice para busca fuzzy (Levenshtein) sobre os termos distintos dos nomes.
+
+    Termos são os tokens com 2+ caracteres e as concatenações de tokens
+    adjacentes ('joao da silva' -> 'joao', 'da', 'silva', 'joaoda', 'dasilva').
+    Cada termo aponta para os row_ids que o contêm.
+
+    A consulta usa o filtro por contagem de q-gramas (lema de Ukkonen): se
+    ed(x, y) <= d, x e y compartilham pelo menos max(|x|, |y|) + 2 - 3d
+    trigramas (com padding de 2 caracteres). Assim só os termos na vizinhança
+    do termo buscado são comparados com Levenshtein, todos de uma vez pela
+    função de similaridade em lote. A construção é linear e não calcula
+    distâncias, e remoções são diretas (ao contrário de uma BK-tree).
+    """
+
+    N = 3
+    PAD = '\x01' * (N - 1)
+
+    def __init__(self, similaridades: Callable[[str, Sequence[str]], np.ndarray]):
+        # similaridades(termo, candidatos) -> array de scores (0 a 1) por candidato
+        self.similaridades = similaridades
+        self.postings: Dict[str, Set[int]] = defaultdict(set)  # termo -> row_ids
+        self.qgramas: Dict[str, Set[str]] = defaultdict(set)   # q-grama -> termos
+        self.por_tamanho: Dict[int, Set[str]] = defaultdict(set)  # tamanho -> termos
+
+    @staticmethod
+    def termos(nome_normalizado: str) -> Set[str]:
+        """Tokens (2+ caracteres) e pares de tokens adjacentes concatenados"""
+        tokens = nome_normalizado.split()
+        termos = {t for t in tokens if len(t) >= 2}
+        termos.update(tokens[j] + tokens[j + 1] for j in range(len(tokens) - 1))
+        return termos
+
+    @classmethod
+    def _qgramas_de(cls, termo: str) -> List[str]:
+        """
+        Trigramas com padding; repetições recebem sufixo numérico para que a
+        contagem de comuns corresponda à interseção de multiconjuntos.
+        """
+        texto = f"{cls.PAD}{termo}{cls.PAD}"
+        vistos = Counter()
+        qgramas = []
+        for i in range(len(texto) - cls.N + 1):
+            qgrama = texto[i:i + cls.N]
+            vistos[qgrama] += 1
+            qgramas.append(qgrama if vistos[qgrama] == 1 else f"{qgrama}{vistos[qgrama]}")
+        return qgramas
+
+    def adicionar(self, row_id: int, nome_normalizado: str):
+        for termo in self.termos(nome_normalizado):
+            row_ids = self.postings.get(termo)
+            if row_ids is None:
+                row_ids = self.postings[termo]
+                for qgrama in self._qgramas_de(termo):
+                    self.qgramas[qgrama].add(termo)
+                self.por_tamanho[len(termo)].add(termo)
+            row_ids.add(row_id)
+
+    def remover(self, row_id: int, nome_normalizado: str):
+        for termo in self.termos(nome_normalizado):
+            row_ids = self.postings.get(termo)
+            if row_ids is None:
+                continue
+            row_ids.discard(row_id)
+            if row_ids:
+                continue
+            # Último row_id com este termo: remove-o do índice
+            del self.postings[termo]
+            for qgrama in self._qgramas_de(termo):
+                termos = self.qgramas.get(qgrama)
+                if termos is not None:
+                    termos.discard(termo)
+                    if not termos:
+                        del self.qgramas[qgrama]
+            termos = self.por_tamanho.get(len(termo))
+            if termos is not None:
+                termos.discard(termo)
+                if not termos:
+                    del self.por_tamanho[len(termo)]
+
+    def limpar(self):
+        self.postings.clear()
+        self.qgramas.clear()
+        self.por_tamanho.clear()
+
+    def termos_similares(self, termo: str, threshold: float) -> List[str]:
+        """
+        Termos do índice com similaridade >= threshold, onde
+        similaridade = 1 - distância / max(len(termo), len(candidato)).
+        """
+        return list(self.termos_com_score(termo, threshold))
+
+    def termos_com_score(self, termo: str, threshold: float) -> Dict[str, float]:
+        """Como termos_similares, mas devolve termo -> similaridade"""
+        tamanho = len(termo)
+        if tamanho == 0:
+            return {}
+
+        # Limites de tamanho e de distância compatíveis com o threshold
+        # (epsilon evita perder candidatos por arredondamento; a verificação é exata)
+        tamanho_max = int(tamanho / threshold + 1e-9)
+        tamanho_min = max(1, int(tamanho * threshold - 1e-9))
+        dist_max = int((1.0 - threshold) * tamanho_max + 1e-9)
+        minimo_comuns = tamanho + (self.N - 1) - self.N * dist_max
+
+        if minimo_comuns <= 0:
+            # Termo curto demais para o filtro: compara apenas termos de tamanho compatível
+            candidatos = [
+                t for n in range(tamanho_min, tamanho_max + 1)
+                for t in self.por_tamanho.get(n, ())
+            ]
+        else:
+            contagem = Counter()
+            for qgrama in self._qgramas_de(termo):
+                contagem.update(self.qgramas.get(qgrama, ()))
+            candidatos = [
+                t for t, comuns in contagem.items()
+                if comuns >= minimo_comuns and tamanho_min <= len(t) <= tamanho_max
+            ]
+
+        if not candidatos:
+            return {}
+        scores = self.similaridades(termo, candidatos)
+        return {c: float(score) for c, score in zip(candidatos, scores) if score >= threshold}
+
+    def linhas_similares(self, termo: str, threshold: float) -> Set[int]:
+        """Row_ids com algum termo similar ao termo buscado"""
+        linhas = set()
+        for similar in self.termos_similares(termo, threshold):
+            linhas.update(self.postings[similar])
+        return linhas
+
+    def linhas_com_score(self, termo: str, threshold: float) -> Dict[int, float]:
+        """Row_id -> maior similaridade entre o termo buscado e os termos da linha"""
+        linhas = {}
+        # Do termo menos para o mais similar: o maior score prevalece
+        for similar, score in sorted(self.termos_com_score(termo, threshold).items(), key=lambda x: x[1]):
+            for row_id in self.postings[similar]:
+                linhas[row_id] = score
+        return linhas
@@ -1,22 +1,44 @@
+import os
+import csv
+import codecs
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 from difflib import SequenceMatcher
 import re
+import openpyxl
+
+try:
+    # Motor opcional (Rust), bem mais rápido que o openpyxl para planilhas grandes
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 
 
 class ImportManager:
     """Gerencia a importação de alunos de arquivos .xlsx e .csv"""
 
+    CSV_CHUNK_SIZE = 100_000  # Linhas lidas por vez na importação de CSV
+    CSV_SNIFF_BYTES = 64 * 1024  # Amostra do início do CSV usada para detectar o formato
+    CSV_SNIFF_ROWS = 50  # Linhas da amostra analisadas
+    CSV_SEPARATORS = ';,\t|'
+    XLSX_CHUNK_SIZE = 50_000  # Linhas da planilha validadas por vez
+    XLSX_MAX_COLUMNS = 2  # Nome e RM são procurados só nas duas primeiras colunas
+    RM_PATTERN = r'[+-]?\d+(?:_\d+)*'  # O que int() aceita depois do strip()
+
     def __init__(self):
         self.accepted_extensions = ['.xlsx', '.csv']
 
-    def importar_arquivo(self, file_path: str) -> Dict:
+    def importar_arquivo(self, file_path: str, progresso: Optional[Callable[[int], None]] = None) -> Dict:
         """
         Importa dados de um arquivo .xlsx ou .csv
 
         Args:
             file_path: Caminho do arquivo a importar
+            progresso: Função opcional chamada com o total de alunos já lidos
 
         Returns:
             Dict com os dados importados e validações
@@ -28,43 +50,105 @@ class ImportManager:
 
         try:
             if path.suffix.lower() == '.xlsx':
-                return self._importar_xlsx(file_path)
+                return self._importar_xlsx(file_path, progresso)
             else:
-                return self._importar_csv(file_path)
+                return self._importar_csv(file_path, progresso)
         except Exception as e:
             return {'sucesso': False, 'erro': f'Erro ao ler arquivo: {str(e)}'}
 
-    def _importar_xlsx(self, file_path: str) -> Dict:
-        """Importa dados de um arquivo Excel"""
-        try:
-            df = pd.read_excel(file_path, header=None)
+    def importar_arquivos(self, file_paths: List[str], progresso: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Importa vários arquivos (ex.: uma lista por turma) em paralelo, um por
+        processo, e junta os resultados na ordem em que os arquivos foram dados.
 
-            if df.empty:
-                return {'sucesso': False, 'erro': 'Arquivo Excel vazio'}
+        Args:
+            file_paths: Caminhos dos arquivos .xlsx/.csv
+            progresso: Função opcional chamada com (arquivos concluídos, total)
+                a cada arquivo concluído e periodicamente enquanto aguarda
 
-            # Detecta se há cabeçalho
-            tem_cabecalho, linhas_dados = self._detect_header_xlsx(df)
+        Returns:
+            Dict com os alunos de todos os arquivos, o resultado de cada arquivo
+            e os RMs que aparecem em mais de um arquivo
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        total = len(file_paths)
+        resultados = {}
+
+        processos = min(total, os.cpu_count() or 1)
+        if processos <= 1:
+            for file_path in file_paths:
+                resultados[file_path] = self.importar_arquivo(file_path)
+                if progresso:
+                    progresso(len(resultados), total)
+            return self._juntar_importacoes(file_paths, resultados)
+
+        # spawn: o processo da GUI tem threads do Qt, que não sobrevivem bem a um fork
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as pool:
+            futuros = {pool.submit(_importar_em_processo, file_path): file_path for file_path in file_paths}
+            pendentes = set(futuros)
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, timeout=0.1, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    try:
+                        resultados[futuros[futuro]] = futuro.result()
+                    except Exception as e:
+                        resultados[futuros[futuro]] = {'sucesso': False, 'erro': f'Erro ao ler arquivo: {str(e)}'}
+                if progresso:
+                    progresso(len(resultados), total)
+
+        return self._juntar_importacoes(file_paths, resultados)
+
+    def _juntar_importacoes(self, file_paths: List[str], resultados: Dict[str, Dict]) -> Dict:
+        """Concatena os alunos dos arquivos e aponta os RMs presentes em mais de um deles"""
+        alunos = []
+        origens = []
+        arquivos = {}
+        for file_path in file_paths:
+            resultado = resultados[file_path]
+            if resultado.get('sucesso'):
+                alunos.extend(resultado['alunos'])
+                origens.extend([file_path] * len(resultado['alunos']))
+                arquivos[file_path] = {'sucesso': True, 'total': resultado['total']}
+            else:
+                arquivos[file_path] = {'sucesso': False, 'erro': resultado.get('erro', 'Erro desconhecido')}
 
-            if len(linhas_dados) == 0:
-                return {'sucesso': False, 'erro': 'Nenhum dado encontrado no arquivo Excel'}
+        if not alunos:
+            return {
+                'sucesso': False,
+                'erro': 'Nenhum aluno válido encontrado nos arquivos',
+                'arquivos': arquivos
+            }
 
-            # Identifica as colunas de Nome e RM
-            col_nome, col_rm = self._identify_columns_xlsx(linhas_dados)
+        # Pares (RM, arquivo) distintos; RM com mais de um arquivo é colisão entre turmas
+        rms, aceitos = self._converter_rms([rm for _, rm in alunos])
+        pares = pd.DataFrame({
+            'rm': rms[aceitos],
+            'arquivo': np.array(origens, dtype=object)[aceitos]
+        }).drop_duplicates()
+        repetidos = pares['rm'].duplicated(keep=False)
+        colisoes = {
+            int(rm): arquivos
+            for rm, arquivos in pares[repetidos].groupby('rm', sort=False)['arquivo'].agg(list).items()
+        }
 
-            if col_nome is None or col_rm is None:
-                return {'sucesso': False, 'erro': 'Não foi possível identificar colunas de Nome e RM'}
+        return {
+            'sucesso': True,
+            'alunos': alunos,
+            'total': len(alunos),
+            'tipo': 'multiplos',
+            'arquivos': arquivos,
+            'colisoes': colisoes
+        }
 
-            # Extrai os dados
+    def _importar_xlsx(self, file_path: str, progresso: Optional[Callable[[int], None]] = None) -> Dict:
+        """Importa dados de um arquivo Excel"""
+        try:
             alunos = []
-            for idx, row in linhas_dados.iterrows():
-                try:
-                    nome = str(row.iloc[col_nome]).strip() if col_nome < len(row) else ""
-                    rm = str(row.iloc[col_rm]).strip() if col_rm < len(row) else ""
-
-                    if nome and rm and self._is_valid_rm(rm):
-                        alunos.append((nome, rm))
-                except (IndexError, KeyError, TypeError):
-                    continue
+            for lote in self.importar_xlsx_em_lotes(file_path):
+                alunos.extend(lote)
+                if progresso:
+                    progresso(len(alunos))
 
             if not alunos:
                 return {'sucesso': False, 'erro': 'Nenhum aluno válido encontrado no arquivo'}
@@ -73,12 +157,84 @@ class ImportManager:
                 'sucesso': True,
                 'alunos': alunos,
                 'total': len(alunos),
-                'tipo': 'xlsx'
+                'tipo': 'xlsx',
+                'motor': 'calamine' if CalamineWorkbook is not None else 'openpyxl'
             }
 
+        except ValueError as e:
+            return {'sucesso': False, 'erro': str(e)}
         except Exception as e:
             return {'sucesso': False, 'erro': f'Erro ao processar Excel: {str(e)}'}
 
+    def importar_xlsx_em_lotes(self, file_path: str) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Lê a primeira planilha linha a linha (sem carregar a pasta de trabalho
+        inteira) e produz, a cada XLSX_CHUNK_SIZE linhas, os alunos (nome, rm)
+        válidos. Cabeçalho e colunas são detectados no primeiro lote.
+
+        Raises:
+            ValueError: Se a planilha não tiver dados ou as colunas não forem identificadas
+        """
+        col_nome = col_rm = None
+        vazia = True
+        for linhas in self._lotes_xlsx(file_path):
+            vazia = False
+            lote = pd.DataFrame(
+                [[self._texto_celula(valor) for valor in linha] for linha in linhas], dtype=str
+            )
+            if col_nome is None:
+                # Detecta se há cabeçalho
+                _, lote = self._detect_header_xlsx(lote)
+                if lote.empty:
+                    continue
+                # Identifica as colunas de Nome e RM
+                col_nome, col_rm = self._identify_columns_xlsx(lote)
+                if col_nome is None or col_rm is None:
+                    raise ValueError('Não foi possível identificar colunas de Nome e RM')
+            yield self._extrair_alunos(lote, col_nome, col_rm)
+
+        if vazia:
+            raise ValueError('Arquivo Excel vazio')
+        if col_nome is None:
+            raise ValueError('Nenhum dado encontrado no arquivo Excel')
+
+    def _lotes_xlsx(self, file_path: str) -> Iterator[List[tuple]]:
+        """Linhas da primeira planilha, agrupadas em lotes, com calamine ou openpyxl em modo leitura"""
+        if CalamineWorkbook is not None:
+            linhas = CalamineWorkbook.from_path(file_path).get_sheet_by_index(0).iter_rows()
+            yield from self._agrupar(linha[:self.XLSX_MAX_COLUMNS] for linha in linhas)
+            return
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            planilha = workbook.worksheets[0]
+            # Alguns exportadores gravam dimensões erradas, que truncariam a leitura
+            planilha.reset_dimensions()
+            yield from self._agrupar(planilha.iter_rows(max_col=self.XLSX_MAX_COLUMNS, values_only=True))
+        finally:
+            workbook.close()
+
+    def _agrupar(self, linhas) -> Iterator[List[tuple]]:
+        lote = []
+        for linha in linhas:
+            # Linhas totalmente vazias (comuns no fim de planilhas exportadas) são ignoradas
+            if any(valor is not None and valor != '' for valor in linha):
+                lote.append(linha)
+                if len(lote) >= self.XLSX_CHUNK_SIZE:
+                    yield lote
+                    lote = []
+        if lote:
+            yield lote
+
+    @staticmethod
+    def _texto_celula(valor) -> str:
+        """Texto da célula; números inteiros gravados como float (ex.: 12345.0) viram '12345'"""
+        if valor is None:
+            return ''
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        return str(valor).strip()
+
     def _detect_header_xlsx(self, df: pd.DataFrame) -> Tuple[bool, pd.DataFrame]:
         """Detecta se a primeira linha é um cabeçalho"""
         if df.empty or len(df) < 2:
@@ -145,40 +301,15 @@ class ImportManager:
 
         return col_nome, col_rm
 
-    def _importar_csv(self, file_path: str) -> Dict:
-        """Importa dados de um arquivo CSV com detecção de separador"""
+    def _importar_csv(self, file_path: str, progresso: Optional[Callable[[int], None]] = None) -> Dict:
+        """Importa dados de um arquivo CSV com detecção de encoding, separador e cabeçalho"""
         try:
-            # Tenta detectar o separador
-            separador = self._detect_csv_separator(file_path)
-
-            df = pd.read_csv(file_path, sep=separador, header=None, dtype=str)
-
-            if df.empty:
-                return {'sucesso': False, 'erro': 'Arquivo CSV vazio'}
-
-            # Detecta se há cabeçalho
-            tem_cabecalho, linhas_dados = self._detect_header_csv(df)
-
-            if len(linhas_dados) == 0:
-                return {'sucesso': False, 'erro': 'Nenhum dado encontrado no arquivo CSV'}
-
-            # Identifica as colunas
-            col_nome, col_rm = self._identify_columns_csv(linhas_dados)
-
-            if col_nome is None or col_rm is None:
-                return {'sucesso': False, 'erro': 'Não foi possível identificar colunas de Nome e RM'}
-
-            # Extrai os dados
+            formato = {}
             alunos = []
-            for idx, row in linhas_dados.iterrows():
-                try:
-                    nome = str(row.iloc[col_nome]).strip() if col_nome < len(row) else ""
-                    rm = str(row.iloc[col_rm]).strip() if col_rm < len(row) else ""
-
-                    if nome and rm and self._is_valid_rm(rm):
-                        alunos.append((nome, rm))
-                except (IndexError, KeyError, TypeError):
-                    continue
+            for lote in self.importar_csv_em_lotes(file_path, formato):
+                alunos.extend(lote)
+                if progresso:
+                    progresso(len(alunos))
 
             if not alunos:
                 return {'sucesso': False, 'erro': 'Nenhum aluno válido encontrado no arquivo'}
@@ -188,59 +319,122 @@ class ImportManager:
                 'alunos': alunos,
                 'total': len(alunos),
                 'tipo': 'csv',
-                'separador': separador
+                'separador': formato['separador'],
+                'encoding': formato['encoding']
             }
 
+        except ValueError as e:
+            return {'sucesso': False, 'erro': str(e)}
         except Exception as e:
             return {'sucesso': False, 'erro': f'Erro ao processar CSV: {str(e)}'}
 
-    def _detect_csv_separator(self, file_path: str) -> str:
-        """Detecta o separador do CSV (';' ou ',')"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                primeira_linha = f.readline()
+    def importar_csv_em_lotes(self, file_path: str, formato: Optional[Dict] = None) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Lê o CSV em lotes de CSV_CHUNK_SIZE linhas e produz, a cada lote, os
+        alunos (nome, rm) válidos. O arquivo é aberto uma única vez: encoding,
+        separador e cabeçalho saem de uma amostra do início, que fica no buffer
+        e é reaproveitada pelo parser.
 
-            # Conta ocorrências de cada separador
-            aspas = primeira_linha.count('"')
-            ponto_virgula = primeira_linha.count(';')
-            virgula = primeira_linha.count(',')
+        Args:
+            formato: Dict opcional preenchido com o formato detectado
+                (encoding, separador, aspas, cabecalho)
 
-            # Se há aspas e mais de um ponto-virgula, é provavelmente CSV de PT
-            if aspas > 0 or ponto_virgula > virgula:
-                return ';'
+        Raises:
+            ValueError: Se o arquivo não tiver dados ou as colunas não forem identificadas
+        """
+        col_nome = col_rm = None
+        # peek() não consome: a amostra continua no buffer para o read_csv
+        with open(file_path, 'rb', buffering=self.CSV_SNIFF_BYTES) as origem:
+            detectado = self._farejar_csv(origem.peek(self.CSV_SNIFF_BYTES)[:self.CSV_SNIFF_BYTES])
+            if formato is not None:
+                formato.update(detectado)
+
+            # encoding_errors: um byte inválido depois da amostra não derruba a importação
+            with pd.read_csv(origem, sep=detectado['separador'], quotechar=detectado['aspas'],
+                             encoding=detectado['encoding'], encoding_errors='replace',
+                             skiprows=1 if detectado['cabecalho'] else 0, header=None, dtype=str,
+                             na_filter=False, chunksize=self.CSV_CHUNK_SIZE) as leitor:
+                for lote in leitor:
+                    if col_nome is None:
+                        # Identifica as colunas
+                        col_nome, col_rm = self._identify_columns_csv(lote)
+                        if col_nome is None or col_rm is None:
+                            raise ValueError('Não foi possível identificar colunas de Nome e RM')
+                    yield self._extrair_alunos(lote, col_nome, col_rm)
 
-            return ','
-        except:
-            return ';'  # Padrão para pt-BR
+        if col_nome is None:
+            raise ValueError('Nenhum dado encontrado no arquivo CSV')
 
-    def _detect_header_csv(self, df: pd.DataFrame) -> Tuple[bool, pd.DataFrame]:
-        """Detecta se a primeira linha é um cabeçalho"""
-        if df.empty or len(df) < 2:
-            return False, df
+    def _farejar_csv(self, amostra: bytes) -> Dict:
+        """
+        Detecta encoding, separador, aspas e cabeçalho a partir do início do
+        arquivo (as primeiras CSV_SNIFF_ROWS linhas completas da amostra).
+        """
+        if not amostra.strip():
+            raise ValueError('Arquivo CSV vazio')
 
-        primeira_linha = df.iloc[0]
-        segunda_linha = df.iloc[1] if len(df) > 1 else None
+        encoding = self._detectar_encoding(amostra)
+        texto = amostra.decode(encoding, errors='replace')
+        # Descarta a última linha se a amostra a cortou no meio
+        if len(amostra) >= self.CSV_SNIFF_BYTES and '\n' in texto:
+            texto = texto[:texto.rindex('\n') + 1]
+        linhas = [linha for linha in texto.splitlines() if linha.strip()][:self.CSV_SNIFF_ROWS]
 
-        if segunda_linha is None:
-            return False, df
+        try:
+            dialeto = csv.Sniffer().sniff('\n'.join(linhas), delimiters=self.CSV_SEPARATORS)
+            separador, aspas = dialeto.delimiter, dialeto.quotechar or '"'
+        except csv.Error:
+            # Sniffer indeciso (ex.: uma única coluna): separador mais frequente na primeira linha
+            separador = max(self.CSV_SEPARATORS, key=linhas[0].count) if linhas[0] else ';'
+            if not linhas[0].count(separador):
+                separador = ';'  # Padrão para pt-BR
+            aspas = '"'
+
+        linhas_csv = list(csv.reader(linhas, delimiter=separador, quotechar=aspas))
+        return {
+            'encoding': encoding,
+            'separador': separador,
+            'aspas': aspas,
+            'cabecalho': self._tem_cabecalho(linhas_csv)
+        }
 
-        # Verifica se há algum RM válido na primeira linha
-        primeira_tem_rm = any(
-            self._is_valid_rm(str(val).strip())
-            for val in primeira_linha if str(val).strip()
-        )
+    @staticmethod
+    def _detectar_encoding(amostra: bytes) -> str:
+        """UTF-8 (com ou sem BOM) se a amostra decodificar; senão cp1252, ou latin-1 como último recurso"""
+        if amostra.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            # Incremental: um caractere multibyte cortado no fim da amostra não é erro
+            codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+        try:
+            amostra.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            return 'latin-1'
+
+    def _tem_cabecalho(self, linhas: List[List[str]]) -> bool:
+        """A primeira linha é cabeçalho se não tem RM e a maioria das linhas seguintes tem"""
+        if len(linhas) < 2:
+            return False
 
-        # Verifica se há algum RM válido na segunda linha
-        segunda_tem_rm = any(
-            self._is_valid_rm(str(val).strip())
-            for val in segunda_linha if str(val).strip()
-        )
+        def tem_rm(linha):
+            return any(self._is_valid_rm(valor.strip()) for valor in linha if valor.strip())
 
-        # Se a primeira linha não tem RM mas segunda tem, primeira é cabeçalho
-        if not primeira_tem_rm and segunda_tem_rm:
-            return True, df.iloc[1:].reset_index(drop=True)
+        seguintes = linhas[1:]
+        com_rm = sum(1 for linha in seguintes if tem_rm(linha))
+        return not tem_rm(linhas[0]) and com_rm * 2 >= len(seguintes)
 
-        return False, df
+    def _extrair_alunos(self, lote: pd.DataFrame, col_nome: int, col_rm: int) -> List[Tuple[str, str]]:
+        """Extrai (nome, rm) das linhas com nome preenchido e RM inteiro, coluna a coluna"""
+        if col_nome >= lote.shape[1] or col_rm >= lote.shape[1]:
+            return []
+        nomes = lote.iloc[:, col_nome].fillna('').str.strip()
+        rms = lote.iloc[:, col_rm].fillna('').str.strip()
+        validos = (nomes != '') & rms.str.fullmatch(self.RM_PATTERN)
+        return list(zip(nomes[validos].tolist(), rms[validos].tolist()))
 
     def _identify_columns_csv(self, df: pd.DataFrame) -> Tuple[Optional[int], Optional[int]]:
         """Identifica qual coluna tem nomes e qual tem RMs"""
@@ -289,43 +483,54 @@ class ImportManager:
         """Verifica se o texto contém letras"""
         return bool(re.search(r'[a-zA-ZÀ-ÿ]', text))
 
-    def validar_alunos_importados(self, alunos: List[Tuple[str, str]], data_manager) -> Dict:
+    def validar_alunos_importados(self, alunos: List[Tuple[str, str]], data_manager,
+                                  colisoes: Optional[Dict[int, List[str]]] = None) -> Dict:
         """
         Valida alunos importados contra a base de dados
 
         Args:
             alunos: Lista de tuplas (nome, rm)
             data_manager: Gerenciador de dados para validação
+            colisoes: RMs presentes em mais de um arquivo (importação múltipla),
+                com os arquivos em que aparecem
 
         Returns:
             Dict com validações e alunos válidos
         """
-        rms_duplicados = []
-        rms_vistos = set()
-        alunos_validos = []
+        if not alunos:
+            return {
+                'alunos_validos': [],
+                'rms_duplicados': [],
+                'total_importados': 0,
+                'total_validos': 0
+            }
 
-        for nome, rm in alunos:
-            try:
-                rm_int = int(rm)
-            except ValueError:
-                continue
-
-            # Verifica duplicata dentro da importação
-            if rm_int in rms_vistos:
-                rms_duplicados.append((rm_int, "Duplicado na importação"))
-                continue
-
-            # Verifica duplicata na database
-            if data_manager and hasattr(data_manager, 'excel_manager'):
-                if not data_manager.excel_manager.df.empty:
-                    df = data_manager.excel_manager.df
-                    if rm_int in df['RM'].values:
-                        aluno_existente = df[df['RM'] == rm_int].iloc[0]['Nome do(a) Aluno(a)']
-                        rms_duplicados.append((rm_int, aluno_existente))
-                        continue
-
-            rms_vistos.add(rm_int)
-            alunos_validos.append((nome, rm_int))
+        # Converte a importação uma única vez; RMs que int() rejeita são descartados
+        nomes = np.array([nome for nome, _ in alunos], dtype=object)
+        rms, convertidos = self._converter_rms([rm for _, rm in alunos])
+        nomes, rms = nomes[convertidos], rms[convertidos]
+
+        # RMs que já existem na database (uma junção contra a coluna RM)
+        if data_manager is not None:
+            nomes_existentes = data_manager.get_nomes_por_rms(rms)
+        else:
+            nomes_existentes = np.full(len(rms), None, dtype=object)
+        no_banco = pd.notna(nomes_existentes)
+
+        # Duplicatas dentro da importação (a primeira ocorrência é mantida)
+        duplicados = pd.Series(rms).duplicated().to_numpy() & ~no_banco
+
+        problemas = np.flatnonzero(no_banco | duplicados)
+        motivos = np.where(no_banco, nomes_existentes, "Duplicado na importação")
+        if colisoes:
+            entre_arquivos = duplicados & pd.Series(rms).isin(list(colisoes)).to_numpy()
+            for i in np.flatnonzero(entre_arquivos):
+                nomes_arquivos = ", ".join(os.path.basename(arquivo) for arquivo in colisoes[rms[i]])
+                motivos[i] = f"Em mais de um arquivo ({nomes_arquivos})"
+        rms_duplicados = list(zip(rms[problemas].tolist(), motivos[problemas].tolist()))
+
+        validos = ~(no_banco | duplicados)
+        alunos_validos = list(zip(nomes[validos].tolist(), rms[validos].tolist()))
 
         return {
             'alunos_validos': alunos_validos,
@@ -333,3 +538,25 @@ class ImportManager:
             'total_importados': len(alunos),
             'total_validos': len(alunos_validos)
         }
+
+    def _converter_rms(self, rms: List) -> Tuple[np.ndarray, np.ndarray]:
+        """RMs como int64 e a máscara dos que int() aceita; só os casos fora do padrão passam por int()"""
+        textos = pd.Series(rms, dtype=str).str.strip()
+        digitos = textos.str.replace('_', '', regex=False)
+        # Até 18 dígitos sempre cabem em int64; os maiores passam por int() e, se estourarem, são rejeitados
+        cabem = digitos.str.lstrip('+-0').str.len() <= 18
+        aceitos = (textos.str.fullmatch(self.RM_PATTERN) & cabem).to_numpy(dtype=bool, copy=True)
+        valores = np.zeros(len(rms), dtype=np.int64)
+        valores[aceitos] = digitos[aceitos].astype(np.int64).to_numpy()
+        for i in np.flatnonzero(~aceitos):
+            try:
+                valores[i] = int(rms[i])
+                aceitos[i] = True
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return valores, aceitos
+
+
+def _importar_em_processo(file_path: str) -> Dict:
+    """Importa um arquivo em um processo do pool (função de módulo, para ser serializável)"""
+    return ImportManager().importar_arquivo(file_path)
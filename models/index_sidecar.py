@@ -0,0 +1,205 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pyarrow as pa
+
+
+class IndexSidecar:
+    """
+    Persiste os índices do DataManager em um arquivo ao lado do .feather
+    (ex.: alunos.feather -> alunos.feather.idx).
+
+    O sidecar é um arquivo Arrow IPC só com dados (listas de chaves, inteiros
+    e strings), então abrir um .idx de terceiros nunca executa código. Ele é
+    versionado e chaveado pelo tamanho, mtime e hash do conteúdo do .feather.
+    Se o tamanho divergir, ou se o mtime mudar e o hash também, o sidecar é
+    ignorado e os índices são reconstruídos.
+    """
+
+    VERSION = 4
+    SUFFIX = '.idx'
+    HASH_CHUNK_SIZE = 1024 * 1024
+    # Termos repetidos entre os conjuntos ficam gravados uma vez só
+    TERMOS = pa.dictionary(pa.int32(), pa.string())
+
+    # Caminho no dict de índices -> (tipo das chaves, tipo dos valores, valores são conjuntos)
+    MAPAS = {
+        ('nomes_normalizados',): (pa.int64(), pa.string(), False),
+        ('rm_index',): (pa.int64(), pa.int64(), False),
+        ('nome_index',): (pa.string(), pa.int64(), True),
+        ('trigramas',): (pa.string(), pa.int64(), True),
+        ('fuzzy', 'postings'): (pa.string(), pa.int64(), True),
+        ('fuzzy', 'qgramas'): (pa.string(), TERMOS, True),
+        ('fuzzy', 'por_tamanho'): (pa.int64(), TERMOS, True),
+    }
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.schema = pa.schema([
+            pa.field(f"{'.'.join(caminho)}:{parte}", pa.list_(tipo))
+            for caminho, (tipo_chave, tipo_valor, conjuntos) in self.MAPAS.items()
+            for parte, tipo in [('chaves', tipo_chave), ('valores', tipo_valor)]
+            + ([('tamanhos', pa.int64())] if conjuntos else [])
+        ])
+
+    def sidecar_path(self, feather_path: str) -> str:
+        """Caminho do sidecar correspondente ao arquivo .feather"""
+        return f"{feather_path}{self.SUFFIX}"
+
+    def carregar(self, feather_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Lê os índices do sidecar, se existir e ainda corresponder ao .feather.
+
+        Returns:
+            Dict com os índices ou None se o sidecar estiver ausente/obsoleto
+        """
+        path = self.sidecar_path(feather_path)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with pa.memory_map(path) as origem:
+                leitor = pa.ipc.open_file(origem)
+                metadados = leitor.schema.metadata or {}
+                if metadados.get(b'versao') != str(self.VERSION).encode():
+                    self.logger.debug(f"Sidecar com versão incompatível: {path}")
+                    return None
+                # A chave vem dos metadados: só se ela conferir as colunas são lidas
+                if not self._chave_confere(feather_path, json.loads(metadados.get(b'chave', b'{}'))):
+                    self.logger.debug(f"Sidecar desatualizado em relação ao arquivo: {path}")
+                    return None
+                if not leitor.schema.remove_metadata().equals(self.schema):
+                    self.logger.debug(f"Sidecar com colunas inesperadas: {path}")
+                    return None
+                tabela = leitor.read_all()
+            return self._decodificar(tabela)
+        except Exception as e:
+            self.logger.warning(f"Sidecar de índices ilegível ({path}): {e}")
+            return None
+
+    def salvar(self, feather_path: str, indices: Dict[str, Any]) -> bool:
+        """Grava o sidecar de forma atômica (arquivo temporário + rename)"""
+        path = self.sidecar_path(feather_path)
+        tmp_path = f"{path}.tmp"
+        try:
+            metadados = {
+                'versao': str(self.VERSION),
+                'chave': json.dumps(self._calcular_chave(feather_path))
+            }
+            tabela = self._codificar(indices).replace_schema_metadata(metadados)
+            with pa.OSFile(tmp_path, 'wb') as destino:
+                with pa.ipc.new_file(destino, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Falha ao gravar sidecar de índices ({path}): {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def descartar(self, feather_path: str):
+        """Apaga o sidecar (ex.: índices gravados enquanto os dados mudavam)"""
+        try:
+            os.remove(self.sidecar_path(feather_path))
+        except OSError:
+            pass
+
+    def _codificar(self, indices: Dict[str, Any]) -> pa.Table:
+        """
+        Uma linha por arquivo: cada mapa vira a lista das chaves e a dos valores;
+        nos mapas de conjuntos os valores são concatenados e `tamanhos` guarda
+        quantos pertencem a cada chave.
+        """
+        colunas = []
+        for caminho, (tipo_chave, tipo_valor, conjuntos) in self.MAPAS.items():
+            mapa = indices
+            for parte in caminho:
+                mapa = mapa[parte]
+            colunas.append(self._lista(list(mapa.keys()), tipo_chave))
+            if conjuntos:
+                valores = [valor for conjunto in mapa.values() for valor in conjunto]
+                colunas.append(self._lista(valores, tipo_valor))
+                colunas.append(self._lista([len(conjunto) for conjunto in mapa.values()], pa.int64()))
+            else:
+                colunas.append(self._lista(list(mapa.values()), tipo_valor))
+        return pa.Table.from_arrays(colunas, schema=self.schema)
+
+    def _decodificar(self, tabela: pa.Table) -> Optional[Dict[str, Any]]:
+        """Reconstrói os dicts (e os conjuntos) a partir da linha gravada por _codificar"""
+        if tabela.num_rows != 1:
+            return None
+        indices = {}
+        for caminho, (_, _, conjuntos) in self.MAPAS.items():
+            nome = '.'.join(caminho)
+            chaves = tabela.column(f"{nome}:chaves")[0].values.to_pylist()
+            valores = self._para_lista(tabela.column(f"{nome}:valores")[0].values)
+            if conjuntos:
+                tamanhos = tabela.column(f"{nome}:tamanhos")[0].values.to_numpy()
+                if len(tamanhos) != len(chaves) or int(tamanhos.sum()) != len(valores):
+                    return None
+                fins = np.cumsum(tamanhos).tolist()
+                mapa = {
+                    chave: set(valores[inicio:fim])
+                    for chave, inicio, fim in zip(chaves, [0] + fins[:-1], fins)
+                }
+            else:
+                if len(valores) != len(chaves):
+                    return None
+                mapa = dict(zip(chaves, valores))
+
+            destino = indices
+            for parte in caminho[:-1]:
+                destino = destino.setdefault(parte, {})
+            destino[caminho[-1]] = mapa
+        return indices
+
+    @staticmethod
+    def _para_lista(valores: pa.Array) -> list:
+        """Converte para lista Python; termos de dicionário viram o mesmo objeto str"""
+        if pa.types.is_dictionary(valores.type):
+            termos = np.array(valores.dictionary.to_pylist(), dtype=object)
+            return termos[valores.indices.to_numpy()].tolist()
+        return valores.to_pylist()
+
+    @staticmethod
+    def _lista(valores, tipo) -> pa.Array:
+        """Lista única (uma linha) com todos os valores"""
+        return pa.ListArray.from_arrays(
+            pa.array([0, len(valores)], type=pa.int32()), pa.array(valores, type=tipo)
+        )
+
+    def _calcular_chave(self, feather_path: str) -> Dict[str, Any]:
+        stat = os.stat(feather_path)
+        return {
+            'tamanho': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': self._hash_arquivo(feather_path)
+        }
+
+    def _chave_confere(self, feather_path: str, chave: Dict[str, Any]) -> bool:
+        """Compara tamanho e mtime; o hash só é calculado se o mtime mudou"""
+        try:
+            stat = os.stat(feather_path)
+        except OSError:
+            return False
+
+        if stat.st_size != chave.get('tamanho'):
+            return False
+        if stat.st_mtime_ns == chave.get('mtime_ns'):
+            return True
+        # Ex.: arquivo copiado/restaurado com o mesmo conteúdo
+        return self._hash_arquivo(feather_path) == chave.get('hash')
+
+    def _hash_arquivo(self, feather_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(feather_path, 'rb') as f:
+            for bloco in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(bloco)
+        return digest.hexdigest()
@@ -1,6 +1,8 @@
+import heapq
 import logging
-from PyQt5.QtCore import Qt
-from utils.helpers import remove_acentos
+from PyQt5.QtCore import QTimer
+from models.search_worker import SearchWorkerThread
+from utils.helpers import normalizar_texto
 
 # Minimum Levenshtein similarity score to consider a name a match (0-1).
 # 0.75 = 75% similar. Adjust up for stricter, down for more lenient results.
@@ -10,115 +12,321 @@ FUZZY_THRESHOLD = 0.75
 # Avoids noisy results for very short queries.
 FUZZY_MIN_LENGTH = 4
 
+# Inactivity (ms) after the last keystroke before a live search is started.
+LIVE_SEARCH_DEBOUNCE_MS = 250
+
+# Number of ranked results shown at once; "show more" adds another page.
+SEARCH_TOP_K = 100
+
+# Layer that matched each result, in rank order (exact > token > fuzzy).
+LAYER_EXACT = 'exata'
+LAYER_TOKEN = 'tokens'
+LAYER_FUZZY = 'fuzzy'
+LAYER_RM = 'rm'
+
 
 class SearchManager:
-    def __init__(self, excel_manager, table_manager, message_handler):
+    def __init__(self, excel_manager, table_manager, message_handler, data_manager):
         self.logger = logging.getLogger(__name__)
         self.excel_manager = excel_manager
         self.table_manager = table_manager
         self.message_handler = message_handler
+        # Dono dos nomes normalizados e do índice de trigramas (mantidos a cada mutação)
+        self.data_manager = data_manager
+
+        # Busca enquanto digita: debounce + worker; só o resultado da geração
+        # mais recente é aplicado, consultas obsoletas são canceladas
+        self.live_search_timer = QTimer()
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.timeout.connect(self._start_live_search)
+        self._pending_term = ''
+        self._geracao = 0
+        self._limit = SEARCH_TOP_K  # Cresce com "mostrar mais"; volta ao padrão quando o termo muda
+        self._versao_busca = None  # Versão dos dados quando a busca atual começou
+        self._workers = []  # Mantém referências até cada thread terminar
+        # Último resultado aplicado (dict de run_search), base para refinar o próximo termo
+        self._ultimo_resultado = None
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def search_student(self, search_term):
-        """Executa a busca por aluno baseada no termo fornecido.
-
-        A busca é realizada em três camadas progressivas:
-          1. Substring exata (normalizada/sem acentos) — rápida, sem custo.
-          2. Todos os tokens do termo estão presentes no nome (ordem livre).
-          3. Fuzzy por Levenshtein token-a-token (captura typos e junções como
-             'Joaoda' ao buscar 'Joao da').
-        """
-        if not hasattr(self.excel_manager, 'df') or self.excel_manager.df.empty:
-            self.logger.warning("Tentativa de busca sem dados carregados.")
-            return False
-
+    def schedule_live_search(self, search_term):
+        """Agenda uma busca em segundo plano (chamado a cada tecla digitada)."""
+        if search_term.strip() != self._pending_term.strip():
+            self._limit = SEARCH_TOP_K
+        self._pending_term = search_term
+        self._cancel_running()
         if not search_term.strip():
+            self.live_search_timer.stop()
             self.restore_full_list()
-            return True
-
-        normalized_term = remove_acentos(search_term.strip().lower())
-
-        if normalized_term.isdigit():
-            result = self._search_by_rm(normalized_term)
-            self.message_handler.show_search_results(len(result), by_rm=True)
+            return
+        self.live_search_timer.start(LIVE_SEARCH_DEBOUNCE_MS)
+
+    def search_now(self, search_term):
+        """Dispara a busca em segundo plano imediatamente (Enter / botão de busca)."""
+        self.schedule_live_search(search_term)
+        if self.live_search_timer.isActive():
+            self.live_search_timer.stop()
+            self._start_live_search()
+
+    def show_more(self):
+        """Amplia a busca atual em mais SEARCH_TOP_K resultados."""
+        self._limit += SEARCH_TOP_K
+        self.search_now(self._pending_term)
+
+    def run_search(self, normalized_term, limit=SEARCH_TOP_K, narrow_to=None, is_cancelled=None):
+        """Executa a busca ranqueada sem tocar na GUI (seguro para rodar no worker).
+
+        Args:
+            normalized_term: Termo já normalizado
+            limit: Quantidade máxima de resultados (top K)
+            narrow_to: Linhas das camadas 1+2 de uma busca anterior cujo termo é
+                prefixo deste; restringe a verificação dessas camadas
+            is_cancelled: Callable consultado entre as camadas
+
+        Returns:
+            Dict com as linhas em ordem de relevância (colunas extras 'score' e
+            'camada') e se há mais resultados, ou None se a busca foi cancelada
+            ou se os dados mudaram durante ela (a GUI refaz a busca)
+        """
+        versao = self.data_manager.versao
+        by_rm = normalized_term.isdigit()
+        if by_rm:
+            base_idx = None
         else:
-            result = self._search_by_name(normalized_term)
-            self.message_handler.show_search_results(len(result), by_rm=False)
-
-        if result.empty:
-            self.logger.info(f"Nenhum resultado encontrado para: '{search_term}'")
-            self.message_handler.show_message("Nenhum aluno encontrado.", "warning")
-
-        result_sorted = result.sort_values('Nome do(a) Aluno(a)')
-        self.table_manager.update_table_with_data(result_sorted)
-        self.table_manager.table.sortByColumn(1, Qt.AscendingOrder)
-        return True
+            ranked = self._rank_name(normalized_term, limit, narrow_to, is_cancelled)
+            if ranked is None:
+                return None
+            hits, has_more, base_idx = ranked
+
+        # As linhas são lidas sob a trava dos comandos: nenhuma é removida no meio
+        with self.data_manager._trava:
+            if self.data_manager.versao != versao:
+                return None
+            if by_rm:
+                result = self._search_by_rm(normalized_term)
+                has_more = len(result) > limit
+                data = result.sort_values('Nome do(a) Aluno(a)').iloc[:limit].assign(
+                    score=1.0, camada=LAYER_RM
+                )
+            else:
+                data = self._rows_for([row_id for row_id, _, _ in hits]).assign(
+                    score=[score for _, score, _ in hits],
+                    camada=[camada for _, _, camada in hits],
+                )
+
+        if is_cancelled is not None and is_cancelled():
+            return None
+        return {
+            'term': normalized_term,
+            'by_rm': by_rm,
+            'versao': versao,
+            'base_idx': base_idx,
+            'has_more': has_more,
+            'data': data,
+        }
 
     def restore_full_list(self):
         """Restaura a lista completa de alunos."""
+        self._ultimo_resultado = None
         if hasattr(self.excel_manager, 'df'):
             record_count = len(self.excel_manager.df)
             self.message_handler.show_record_count(record_count)
-            self.table_manager.update_table()
+            self.table_manager.restore_pages(self.excel_manager.df)
         return True
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    def _start_live_search(self):
+        search_term = self._pending_term
+        if not search_term.strip():
+            return
+        if not hasattr(self.excel_manager, 'df') or self.excel_manager.df.empty:
+            return
+
+        normalized_term = normalizar_texto(search_term.strip())
+
+        # Termo que estende o anterior: as camadas 1 e 2 só podem encolher
+        narrow_to = None
+        ultimo = self._ultimo_resultado
+        if (ultimo is not None and ultimo['base_idx'] is not None
+                and ultimo['versao'] == self.data_manager.versao
+                and normalized_term.startswith(ultimo['term'])):
+            narrow_to = ultimo['base_idx']
+
+        self._cancel_running()
+        self._geracao += 1
+        self._versao_busca = self.data_manager.versao
+        worker = SearchWorkerThread(self, normalized_term, self._geracao, self._limit, narrow_to)
+        worker.result_ready.connect(self._on_live_search_finished)
+        # finished do QThread: só libera a referência quando a thread terminou de fato
+        worker.finished.connect(lambda: self._release_worker(worker))
+        self._workers.append(worker)
+        worker.start()
+
+    def _cancel_running(self):
+        for worker in self._workers:
+            worker.cancelar()
+        # As linhas do resultado anterior vão ser substituídas: para de exibi-las
+        self.table_manager.cancel_streaming()
+
+    def _release_worker(self, worker):
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.deleteLater()
+
+    def _on_live_search_finished(self, geracao, result):
+        if geracao != self._geracao:
+            return  # Consulta obsoleta: já existe uma mais nova
+        if self._versao_busca != self.data_manager.versao:
+            # Dados alterados durante a busca: refaz com o mesmo termo
+            self.live_search_timer.start(LIVE_SEARCH_DEBOUNCE_MS)
+            return
+        if result is None:
+            return  # Erro já registrado pelo worker
+        self._apply_result(result)
+
+    def _apply_result(self, result):
+        """Mostra o resultado na tabela e na barra de mensagens (thread da GUI)."""
+        data = result['data']
+        self.message_handler.show_search_results(
+            len(data), by_rm=result['by_rm'], has_more=result['has_more']
+        )
+
+        if data.empty:
+            self.logger.info(f"Nenhum resultado encontrado para: '{result['term']}'")
+            self.message_handler.show_message("Nenhum aluno encontrado.", "warning")
+
+        self._ultimo_resultado = result
+        self.table_manager.update_table_with_ranked_data(data, has_more=result['has_more'])
+
     def _search_by_rm(self, normalized_term):
         return self.excel_manager.df[
             self.excel_manager.df['RM'].astype(str) == normalized_term
         ]
 
-    def _search_by_name(self, normalized_term):
-        """Busca em três camadas progressivas, retornando a união dos resultados."""
+    def _rows_for(self, matched_idx):
         df = self.excel_manager.df
+        if not matched_idx:
+            return df.iloc[0:0]  # DataFrame vazio com as colunas corretas
+        return df.loc[list(matched_idx)]
 
-        # Coluna de nomes normalizada (calculada uma única vez)
-        names_normalized = df['Nome do(a) Aluno(a)'].apply(
-            lambda x: remove_acentos(str(x).lower())
-        )
+    def _rank_name(self, normalized_term, limit, narrow_to=None, is_cancelled=None):
+        """Top K por relevância: camada exata > tokens > fuzzy, e score dentro da camada.
+
+        Como toda linha de uma camada supera as das camadas seguintes, as
+        camadas inferiores não são avaliadas quando as superiores já encontraram
+        mais de `limit` linhas.
+
+        Returns:
+            ([(row_id, score, camada), ...], há mais resultados, linhas das
+            camadas 1+2 ou None se a camada 2 foi pulada), ou None se cancelada
+        """
+        names_normalized = self.data_manager.nomes_normalizados
+        query_tokens = normalized_term.split()
+        # Um a mais que o limite: basta para saber se há mais resultados
+        wanted = limit + 1
 
         # --- Camada 1: substring exata ---
-        mask_exact = names_normalized.str.contains(normalized_term, regex=False)
-        exact_idx = set(df.index[mask_exact])
+        exact_idx = self._substring_match(names_normalized, normalized_term, narrow_to)
+        hits = self._top(
+            exact_idx, lambda i: self._exact_score(names_normalized[i], normalized_term),
+            wanted, LAYER_EXACT, names_normalized,
+        )
+        if len(hits) > limit:
+            return hits[:limit], True, None
+        if is_cancelled is not None and is_cancelled():
+            return None
 
         # --- Camada 2: todos os tokens presentes no nome (ordem livre) ---
-        query_tokens = normalized_term.split()
-        token_idx = self._token_match(names_normalized, query_tokens, exclude=exact_idx)
+        token_idx = self._token_match(names_normalized, query_tokens, exclude=exact_idx,
+                                      narrow_to=narrow_to)
+        base_idx = exact_idx | token_idx
+        hits += self._top(
+            token_idx, lambda i: self._token_score(names_normalized[i], query_tokens),
+            wanted - len(hits), LAYER_TOKEN, names_normalized,
+        )
+        if len(hits) > limit:
+            return hits[:limit], True, base_idx
+        if is_cancelled is not None and is_cancelled():
+            return None
 
         # --- Camada 3: fuzzy Levenshtein (só ativa para termos suficientemente longos) ---
         if len(normalized_term) >= FUZZY_MIN_LENGTH:
-            fuzzy_idx = self._fuzzy_match(
-                names_normalized,
-                query_tokens,
-                exclude=exact_idx | token_idx,
+            fuzzy_scores = self._fuzzy_scores(names_normalized, query_tokens, exclude=base_idx)
+            hits += self._top(
+                fuzzy_scores, fuzzy_scores.get, wanted - len(hits), LAYER_FUZZY, names_normalized,
             )
+
+        return hits[:limit], len(hits) > limit, base_idx
+
+    @staticmethod
+    def _top(row_ids, score_fn, n, camada, names_normalized):
+        """Os n melhores row_ids pelo score (empate: ordem alfabética do nome)."""
+        if n <= 0 or not row_ids:
+            return []
+        best = heapq.nsmallest(
+            n, ((-score_fn(i), names_normalized[i], i) for i in row_ids)
+        )
+        return [(i, -neg_score, camada) for neg_score, _, i in best]
+
+    @staticmethod
+    def _exact_score(name, term):
+        """Quanto do nome o termo cobre, com bônus se o termo inicia o nome ou uma palavra."""
+        if name.startswith(term):
+            inicio = 1.0
+        elif f' {term}' in name:
+            inicio = 0.5
         else:
-            fuzzy_idx = set()
+            inicio = 0.0
+        return (len(term) / max(len(name), 1) + inicio) / 2
 
-        matched_idx = exact_idx | token_idx | fuzzy_idx
+    @staticmethod
+    def _token_score(name, query_tokens):
+        """Fração do nome (sem espaços) coberta pelos tokens da query."""
+        letras = len(name) - name.count(' ')
+        return min(1.0, sum(len(tok) for tok in query_tokens) / max(letras, 1))
 
-        if not matched_idx:
-            return df.iloc[0:0]  # DataFrame vazio com as colunas corretas
+    # --- Camada 1 ---
 
-        return df.loc[sorted(matched_idx)]
+    def _substring_match(self, names_normalized, normalized_term, narrow_to=None):
+        """Retorna índices cujo nome contém o termo inteiro.
+
+        O índice de trigramas reduz a verificação aos candidatos que contêm
+        todos os trigramas do termo; termos com menos de 3 caracteres não
+        podem ser filtrados e caem na varredura completa.
+        """
+        candidates = self.data_manager.trigram_index.candidatos(normalized_term)
+        candidates = self._narrow(candidates, narrow_to, names_normalized)
+        return {i for i in candidates if normalized_term in names_normalized[i]}
+
+    @staticmethod
+    def _narrow(candidates, narrow_to, names_normalized):
+        """Combina os candidatos do índice com o resultado anterior (se houver)."""
+        if narrow_to is None:
+            return names_normalized.keys() if candidates is None else candidates
+        if candidates is None:
+            return narrow_to
+        return candidates & narrow_to
 
     # --- Camada 2 ---
 
-    def _token_match(self, names_normalized, query_tokens, exclude):
+    def _token_match(self, names_normalized, query_tokens, exclude, narrow_to=None):
         """Retorna índices onde TODOS os tokens da query aparecem no nome."""
         if not query_tokens:
             return set()
 
+        candidates = self.data_manager.trigram_index.candidatos_todos_tokens(query_tokens)
+        candidates = self._narrow(candidates, narrow_to, names_normalized)
+
         result_idx = set()
-        for i, name in names_normalized.items():
+        for i in candidates:
             if i in exclude:
                 continue
+            name = names_normalized[i]
             # Todos os tokens devem estar presentes (substring de qualquer parte do nome)
             if all(tok in name for tok in query_tokens):
                 result_idx.add(i)
@@ -126,76 +334,46 @@ class SearchManager:
 
     # --- Camada 3 ---
 
-    def _fuzzy_match(self, names_normalized, query_tokens, exclude):
+    def _fuzzy_scores(self, names_normalized, query_tokens, exclude):
         """
-        Fuzzy matching token-a-token usando Levenshtein.
+        Fuzzy matching token-a-token usando Levenshtein; devolve row_id -> média
+        da melhor similaridade por token.
 
         Estratégia:
-          - Para cada nome no DataFrame, divide-o em tokens.
-          - Para cada token da query, procura o token do nome com maior
-            similaridade (score >= FUZZY_THRESHOLD).
+          - Para cada token da query, o índice fuzzy do DataManager devolve os
+            termos (tokens do nome ou pares de tokens adjacentes concatenados)
+            com similaridade >= FUZZY_THRESHOLD, comparando apenas os termos
+            na vizinhança do token, e os row_ids que os contêm.
           - O nome é incluído somente se TODOS os tokens da query tiverem
-            um par satisfatório no nome.
+            um par satisfatório no nome (interseção dos row_ids).
 
         Isso captura casos como:
           - "Joao da Silva" vs "Joaoda Silva"  (junção de tokens)
           - "Joao" vs "João"                   (já coberto pela normalização)
           - "Silvo" vs "Silva"                 (typo de 1 caractere)
         """
-        try:
-            # Tenta reutilizar o matcher do DataManager (já tem cache aquecido)
-            from models.data_manager import LevenshteinMatcher
-            matcher = LevenshteinMatcher()
-        except ImportError:
-            self.logger.debug("LevenshteinMatcher não disponível; fuzzy search desativado.")
-            return set()
-
-        result_idx = set()
-
-        for i, name in names_normalized.items():
-            if i in exclude:
-                continue
-
-            name_tokens = name.split()
-            if not name_tokens:
-                continue
-
-            # Verifica se cada token da query tem correspondência suficiente
-            # em algum token do nome (ou em pares de tokens concatenados).
-            if self._all_query_tokens_match(matcher, query_tokens, name_tokens):
-                result_idx.add(i)
-
-        return result_idx
-
-    def _all_query_tokens_match(self, matcher, query_tokens, name_tokens):
-        """
-        Retorna True se cada token da query tiver similaridade >= FUZZY_THRESHOLD
-        com pelo menos um token do nome (ou com a concatenação de dois tokens
-        adjacentes, para capturar casos como 'joaoda' = 'joao' + 'da').
-        """
-        # Gera candidatos: tokens individuais + pares adjacentes concatenados
-        # Ex: ["joaoda", "silva"] → candidatos: "joaoda", "silva", "joaodasilva"
-        candidates = list(name_tokens)
-        for j in range(len(name_tokens) - 1):
-            candidates.append(name_tokens[j] + name_tokens[j + 1])
-
-        for q_tok in query_tokens:
-            # Tokens muito curtos (artigos como "da", "de") são ignorados
-            # para evitar falsos positivos no fuzzy.
-            if len(q_tok) <= 2:
-                continue
-
-            best_score = 0.0
-            for candidate in candidates:
-                if len(candidate) < 2:
-                    continue
-                score = matcher.similarity_score(q_tok, candidate)
-                if score > best_score:
-                    best_score = score
-                if best_score >= FUZZY_THRESHOLD:
-                    break  # Early exit: já encontrou match suficiente
-
-            if best_score < FUZZY_THRESHOLD:
-                return False  # Este token da query não teve correspondência
-
-        return True
\ No newline at end of file
+        # Tokens muito curtos (artigos como "da", "de") são ignorados
+        # para evitar falsos positivos no fuzzy.
+        effective_tokens = {tok for tok in query_tokens if len(tok) > 2}
+        if not effective_tokens:
+            return {
+                i: 0.0 for i, name in names_normalized.items()
+                if i not in exclude and name.split()
+            }
+
+        fuzzy_index = self.data_manager.fuzzy_index
+        scores = None
+        # Tokens mais longos primeiro: tendem a ter menos correspondências
+        for q_tok in sorted(effective_tokens, key=len, reverse=True):
+            rows = fuzzy_index.linhas_com_score(q_tok, FUZZY_THRESHOLD)
+            if scores is None:
+                scores = rows
+            else:
+                scores = {i: score + rows[i] for i, score in scores.items() if i in rows}
+            if not scores:
+                return {}
+
+        return {
+            i: score / len(effective_tokens)
+            for i, score in scores.items() if i not in exclude
+        }
@@ -0,0 +1,44 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+import logging
+
+
+class SearchWorkerThread(QThread):
+    """
+    Executa uma busca fora da thread da GUI.
+
+    O cancelamento é cooperativo: a busca consulta `cancelada()` entre as
+    camadas e, se uma consulta mais nova já foi disparada, termina sem emitir
+    resultado útil (result=None).
+    """
+    result_ready = pyqtSignal(int, object)  # geração, resultado (dict) ou None
+
+    def __init__(self, search_manager, normalized_term, geracao, limit, narrow_to=None):
+        super().__init__()
+        self.search_manager = search_manager
+        self.normalized_term = normalized_term
+        self.geracao = geracao
+        self.limit = limit
+        self.narrow_to = narrow_to
+        self._cancelada = False
+        self.logger = logging.getLogger(__name__)
+
+    def cancelar(self):
+        self._cancelada = True
+
+    def cancelada(self) -> bool:
+        return self._cancelada
+
+    def run(self):
+        try:
+            result = self.search_manager.run_search(
+                self.normalized_term, limit=self.limit, narrow_to=self.narrow_to,
+                is_cancelled=self.cancelada
+            )
+        except (RuntimeError, KeyError) as e:
+            # Índices alterados por um comando durante a busca; ela será refeita
+            self.logger.debug(f"Busca interrompida por alteração concorrente: {e}")
+            result = None
+        except Exception:
+            self.logger.error("Erro na busca em segundo plano", exc_info=True)
+            result = None
+        self.result_ready.emit(self.geracao, None if self._cancelada else result)
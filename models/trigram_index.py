@@ -0,0 +1,74 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas sobre os nomes normalizados.
+
+    Cada trigrama aponta para o conjunto de row_ids cujo nome o contém.
+    Uma busca por substring intersecta os postings dos trigramas do termo e
+    só os candidatos sobreviventes precisam ser verificados com `in`.
+    Termos com menos de 3 caracteres não podem ser filtrados (retorna None).
+    """
+
+    N = 3
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+
+    @classmethod
+    def trigramas(cls, texto: str) -> Set[str]:
+        """Trigramas distintos de um texto (inclui espaços entre palavras)"""
+        return {texto[i:i + cls.N] for i in range(len(texto) - cls.N + 1)}
+
+    def adicionar(self, row_id: int, texto: str):
+        for trigrama in self.trigramas(texto):
+            self.postings[trigrama].add(row_id)
+
+    def remover(self, row_id: int, texto: str):
+        for trigrama in self.trigramas(texto):
+            row_ids = self.postings.get(trigrama)
+            if row_ids is None:
+                continue
+            row_ids.discard(row_id)
+            if not row_ids:
+                del self.postings[trigrama]
+
+    def limpar(self):
+        self.postings.clear()
+
+    def candidatos(self, termo: str) -> Optional[Set[int]]:
+        """
+        Row_ids que contêm todos os trigramas do termo (superconjunto das
+        linhas em que o termo é substring).
+
+        Returns:
+            Conjunto de candidatos, ou None se o termo for curto demais para filtrar
+        """
+        trigramas = self.trigramas(termo)
+        if not trigramas:
+            return None
+
+        # Intersecta a partir do menor postings para reduzir o trabalho
+        listas = sorted((self.postings.get(t, ()) for t in trigramas), key=len)
+        if not listas[0]:
+            return set()
+        return set(listas[0]).intersection(*listas[1:])
+
+    def candidatos_todos_tokens(self, tokens: Iterable[str]) -> Optional[Set[int]]:
+        """
+        Intersecta os candidatos de cada token com 3+ caracteres.
+
+        Returns:
+            Conjunto de candidatos, ou None se nenhum token permitir filtrar
+        """
+        resultado = None
+        for token in sorted(tokens, key=len, reverse=True):
+            candidatos = self.candidatos(token)
+            if candidatos is None:
+                continue
+            resultado = candidatos if resultado is None else resultado & candidatos
+            if not resultado:
+                return set()
+        return resultado
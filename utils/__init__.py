@@ -7,7 +7,10 @@ from .styles import (
 )
 
 from .helpers import (
-    remove_acentos
+    remove_acentos,
+    normalizar_texto,
+    postos_colacao,
+    chave_colacao
 )
 
 from .ui_helpers import (
@@ -17,6 +20,9 @@ from .ui_helpers import (
 
 __all__ = [
     'remove_acentos',
+    'normalizar_texto',
+    'postos_colacao',
+    'chave_colacao',
     'CenterWindowMixin',
     'add_shadow',
     'get_stylesheet',
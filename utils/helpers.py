@@ -1,4 +1,7 @@
 import unicodedata
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
 def remove_acentos(texto):
     """Remove acentos e caracteres especiais de uma string"""
@@ -8,6 +11,47 @@ def remove_acentos(texto):
     texto = ''.join([c for c in texto if not unicodedata.combining(c)])
     return texto
 
+def normalizar_texto(texto) -> str:
+    """
+    Normalização única usada em buscas, índices e comparação de nomes:
+    remove acentos e converte para minúsculas (nessa ordem).
+    """
+    return remove_acentos(texto).lower()
+
+def postos_colacao(valores) -> np.ndarray:
+    """
+    Posição de cada texto na ordem alfabética do português: compara sem acentos
+    e sem diferenciar maiúsculas (Á = a, Ç = c) e desempata pelo texto original.
+    Vetorizado (pyarrow), para ordenar colunas inteiras de uma vez.
+    """
+    textos = _array_texto(valores)
+    if pc.all(pc.string_is_ascii(textos)).as_py() is not False:
+        chaves = pc.ascii_lower(textos)  # Sem acentos possíveis: dispensa a normalização
+    else:
+        chaves = pc.utf8_lower(pc.replace_substring_regex(pc.utf8_normalize(textos, 'NFKD'), r'\p{Mn}', ''))
+    ordem = pc.sort_indices(
+        pa.table({'chave': chaves, 'texto': textos}),
+        sort_keys=[('chave', 'ascending'), ('texto', 'ascending')]
+    ).to_numpy()
+    postos = np.empty(len(textos), dtype=np.int64)
+    postos[ordem] = np.arange(len(textos))
+    return postos
+
+def _array_texto(valores) -> pa.Array:
+    """Valores como array Arrow de strings; colunas de strings Arrow passam sem cópia"""
+    try:
+        textos = pa.array(valores)
+        if (pa.types.is_string(textos.type) or pa.types.is_large_string(textos.type)) and not textos.null_count:
+            return textos
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    return pa.array([str(v) for v in valores], type=pa.string())
+
+def chave_colacao(texto) -> tuple:
+    """Chave de um único texto na mesma ordem de postos_colacao (para buscas binárias)"""
+    texto = str(texto)
+    return normalizar_texto(texto), texto
+
 def formatar_nome(nome: str) -> str:
     """
     Formata nomes de acordo com as regras especificadas:
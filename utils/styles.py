@@ -37,6 +37,21 @@ def apply_theme(app: QApplication, theme_name: Optional[str] = None) -> str:
             widget.update_ui_on_theme_change()
     return theme_name
 
+def load_render_mode() -> str:
+    """Carrega o modo de renderização salvo ('auto', 'lightweight' ou 'full')."""
+    return config.get_render_mode()
+
+def save_render_mode(mode: str) -> None:
+    """Persiste o modo de renderização."""
+    config.set_render_mode(mode)
+
+def use_lightweight_shadows(row_count: int) -> bool:
+    """Indica se as sombras devem ser leves para a quantidade de alunos exibida."""
+    mode = load_render_mode()
+    if mode == 'auto':
+        return row_count > config.get_lightweight_row_threshold()
+    return mode == 'lightweight'
+
 def get_current_stylesheet() -> str:
     """Retorna a folha de estilo do tema atual."""
     return _read_css_file(load_theme_preference())
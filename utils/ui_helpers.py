@@ -114,9 +114,12 @@ class MessageHandler:
         """Mostra mensagem de aviso."""
         self.show_message(message, MESSAGE_WARNING)
 
-    def show_search_results(self, count: int, by_rm: bool = False):
+    def show_search_results(self, count: int, by_rm: bool = False, has_more: bool = False):
         """Mostra resultados de busca."""
         search_type = "RM" if by_rm else "nome"
+        if has_more:
+            self.show_message(f"Busca por {search_type}: exibindo os {count} resultados mais relevantes", MESSAGE_SEARCH)
+            return
         self.show_message(f"Busca por {search_type} encontrou {count} resultados", MESSAGE_SEARCH)
 
     def show_record_count(self, count: int):
@@ -194,6 +197,24 @@ def add_shadow(
     shadow.setColor(color)
     widget.setGraphicsEffect(shadow)
 
+def set_shadow_mode(widgets: list[QWidget], lightweight: bool) -> None:
+    """Alterna entre sombra real e sombra leve.
+
+    O QGraphicsDropShadowEffect faz o widget ser composto fora da tela a cada
+    repintura (em uma tabela, a cada passo do scroll). No modo leve o efeito é
+    removido e a sombra vira uma borda inferior/direita desenhada pelo tema
+    (propriedade lightShadow nos arquivos .css).
+    """
+    for widget in widgets:
+        if lightweight:
+            widget.setGraphicsEffect(None)
+        elif not isinstance(widget.graphicsEffect(), QGraphicsDropShadowEffect):
+            add_shadow(widget)
+        if widget.property("lightShadow") != lightweight:
+            widget.setProperty("lightShadow", lightweight)
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+
 def update_shadows_on_theme_change(widgets: list[QWidget]) -> None:
     """Atualiza as sombras de uma lista de widgets quando o tema muda."""
     for widget in widgets:
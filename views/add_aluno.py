@@ -1,3 +1,4 @@
+import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
     QPushButton, QLabel, QMessageBox, QHeaderView,
@@ -261,10 +262,9 @@ class AddAlunoWindow(QDialog, CenterWindowMixin, TableNavigationMixin):
                 return
 
             # Verifica duplicatas no arquivo
-            if self.data_manager and hasattr(self.data_manager, 'excel_manager'):
-                df = self.data_manager.excel_manager.df
-                if not df.empty and rm_int in df['RM'].values:
-                    aluno_existente = df[df['RM'] == rm_int].iloc[0]['Nome do(a) Aluno(a)']
+            if self.data_manager:
+                aluno_existente = self.data_manager.get_nome_por_rm(rm_int)
+                if aluno_existente is not None:
                     self._show_duplicate_message(rm_int, [aluno_existente], item)
                     return
 
@@ -332,15 +332,18 @@ class AddAlunoWindow(QDialog, CenterWindowMixin, TableNavigationMixin):
     def _abrir_dialogo_importacao(self):
         """Abre um diálogo para selecionar arquivo de importação"""
         file_filter = "Arquivos Suportados (*.xlsx *.csv);;Excel (*.xlsx);;CSV (*.csv);;Todos os arquivos (*)"
-        file_path, _ = QFileDialog.getOpenFileName(
+        # Vários arquivos (ex.: uma lista por turma) são importados em paralelo
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "Importar Alunos",
             "",
             file_filter
         )
 
-        if file_path:
-            self._importar_arquivo(file_path)
+        if len(file_paths) == 1:
+            self._importar_arquivo(file_paths[0])
+        elif file_paths:
+            self._importar_arquivos(file_paths)
 
     def _importar_arquivo(self, file_path: str):
         """Importa alunos de um arquivo"""
@@ -349,8 +352,8 @@ class AddAlunoWindow(QDialog, CenterWindowMixin, TableNavigationMixin):
             self.btn_importar_alunos.setText("Importando...")
             QApplication.processEvents()
 
-            # Importa o arquivo
-            resultado = self.import_manager.importar_arquivo(file_path)
+            # Importa o arquivo (CSV em lotes: a janela continua respondendo entre eles)
+            resultado = self.import_manager.importar_arquivo(file_path, progresso=self._atualizar_progresso_importacao)
 
             if not resultado['sucesso']:
                 self._safe_show_message(
@@ -360,47 +363,56 @@ class AddAlunoWindow(QDialog, CenterWindowMixin, TableNavigationMixin):
                 )
                 return
 
-            alunos = resultado['alunos']
+            self._concluir_importacao(resultado['alunos'])
 
-            # Valida alunos importados
-            validacao = self.import_manager.validar_alunos_importados(alunos, self.data_manager)
+        except Exception as e:
+            self._safe_show_message(
+                "Erro",
+                f"Falha ao importar arquivo:\n{str(e)}",
+                QMessageBox.Critical
+            )
+
+        finally:
+            self.btn_importar_alunos.setEnabled(True)
+            self.btn_importar_alunos.setText("Importar Alunos")
 
-            rms_duplicados = validacao['rms_duplicados']
-            alunos_validos = validacao['alunos_validos']
+    def _importar_arquivos(self, file_paths: list):
+        """Importa alunos de vários arquivos em paralelo e junta o resultado"""
+        try:
+            self.btn_importar_alunos.setEnabled(False)
+            self.btn_importar_alunos.setText("Importando...")
+            QApplication.processEvents()
 
-            # Mostra aviso de RMs duplicados se houver
-            if rms_duplicados:
-                AlunoDialogs.show_import_duplicate_rms(self, rms_duplicados)
+            resultado = self.import_manager.importar_arquivos(
+                file_paths, progresso=self._atualizar_progresso_arquivos
+            )
 
-            # Se não há alunos válidos após validação
-            if not alunos_validos:
+            # Arquivos que falharam não impedem a importação dos demais
+            falhas = [
+                f"• {os.path.basename(file_path)}: {info['erro']}"
+                for file_path, info in resultado['arquivos'].items() if not info['sucesso']
+            ]
+            if falhas:
                 self._safe_show_message(
-                    "Aviso",
-                    "Nenhum aluno válido para importar após validação.",
+                    "Arquivos Ignorados",
+                    "Os seguintes arquivos não puderam ser importados:\n\n" + "\n".join(falhas),
                     QMessageBox.Warning
                 )
-                return
 
-            # Mostra confirmação de importação
-            if AlunoDialogs.show_import_confirmation_dialog(
-                self,
-                validacao['total_importados'],
-                validacao['total_validos'],
-                len(rms_duplicados)
-            ):
-                # Preenche a tabela com os alunos válidos
-                self._preencher_tabela_com_importacao(alunos_validos, rms_duplicados)
+            if not resultado['sucesso']:
                 self._safe_show_message(
-                    "Sucesso",
-                    f"{len(alunos_validos)} aluno(s) importado(s) com sucesso!\n\n"
-                    "Revise os dados na tabela. Os RMs duplicados estão destacados em vermelho.",
-                    QMessageBox.Information
+                    "Erro na Importação",
+                    resultado['erro'],
+                    QMessageBox.Critical
                 )
+                return
+
+            self._concluir_importacao(resultado['alunos'], resultado['colisoes'])
 
         except Exception as e:
             self._safe_show_message(
                 "Erro",
-                f"Falha ao importar arquivo:\n{str(e)}",
+                f"Falha ao importar arquivos:\n{str(e)}",
                 QMessageBox.Critical
             )
 
@@ -408,6 +420,53 @@ class AddAlunoWindow(QDialog, CenterWindowMixin, TableNavigationMixin):
             self.btn_importar_alunos.setEnabled(True)
             self.btn_importar_alunos.setText("Importar Alunos")
 
+    def _concluir_importacao(self, alunos: list, colisoes: dict = None):
+        """Valida os alunos lidos, mostra os avisos e preenche a tabela após confirmação"""
+        # Valida alunos importados
+        validacao = self.import_manager.validar_alunos_importados(alunos, self.data_manager, colisoes)
+
+        rms_duplicados = validacao['rms_duplicados']
+        alunos_validos = validacao['alunos_validos']
+
+        # Mostra aviso de RMs duplicados se houver
+        if rms_duplicados:
+            AlunoDialogs.show_import_duplicate_rms(self, rms_duplicados)
+
+        # Se não há alunos válidos após validação
+        if not alunos_validos:
+            self._safe_show_message(
+                "Aviso",
+                "Nenhum aluno válido para importar após validação.",
+                QMessageBox.Warning
+            )
+            return
+
+        # Mostra confirmação de importação
+        if AlunoDialogs.show_import_confirmation_dialog(
+            self,
+            validacao['total_importados'],
+            validacao['total_validos'],
+            len(rms_duplicados)
+        ):
+            # Preenche a tabela com os alunos válidos
+            self._preencher_tabela_com_importacao(alunos_validos, rms_duplicados)
+            self._safe_show_message(
+                "Sucesso",
+                f"{len(alunos_validos)} aluno(s) importado(s) com sucesso!\n\n"
+                "Revise os dados na tabela. Os RMs duplicados estão destacados em vermelho.",
+                QMessageBox.Information
+            )
+
+    def _atualizar_progresso_importacao(self, total_lido: int):
+        """Mostra quantos alunos já foram lidos do arquivo"""
+        self.btn_importar_alunos.setText(f"Importando... ({total_lido})")
+        QApplication.processEvents()
+
+    def _atualizar_progresso_arquivos(self, concluidos: int, total: int):
+        """Mostra quantos arquivos já foram importados"""
+        self.btn_importar_alunos.setText(f"Importando... ({concluidos}/{total} arquivos)")
+        QApplication.processEvents()
+
     def _preencher_tabela_com_importacao(self, alunos_validos: list, rms_duplicados: list):
         """Preenche a tabela com alunos importados e destaca RMs duplicados"""
         # Limpa a tabela
@@ -1,20 +1,25 @@
 import os
-import shutil
 from datetime import datetime
+from functools import partial
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 from PyQt5.QtCore import QTimer
 from models.config_manager import ConfigManager
 from models.file_loader import FileLoaderThread
+from models.file_saver import FileSaverThread
+from models.backup_store import BackupStore
 
 class FileOperations:
     MAX_BACKUPS_PER_FILE = 3  # Mantém apenas os últimos 3 backups por arquivo
-    AUTO_SAVE_DEBOUNCE_MS = 5000  # Aguarda 5 segundos de inatividade antes de auto-salvar
+    AUTO_SAVE_DEBOUNCE_MS = 5000  # Aguarda 5 segundos de inatividade antes de compactar o diário
 
     def __init__(self, main_window):
         self.main_window = main_window
         self.config = ConfigManager()
         self.loader_thread = None
-        # Timer para debounce de auto-save (evita múltiplas gravações em sequência)
+        self.saver_thread = None
+        self.pending_save = None  # Gravação pedida enquanto outra estava em andamento
+        self.backup_store = BackupStore()
+        # Timer para debounce da compactação do diário (evita regravar o arquivo em sequência)
         self.auto_save_timer = QTimer()
         self.auto_save_timer.setSingleShot(True)
         self.auto_save_timer.timeout.connect(self._execute_auto_save)
@@ -51,7 +56,10 @@ class FileOperations:
         return self.save_file_as()
 
     def auto_save(self):
-        """Agenda auto-save com debounce (evita múltiplas gravações seguidas)"""
+        """
+        Grava as alterações no diário do arquivo (só as linhas alteradas) e,
+        se o diário cresceu demais, agenda a compactação com debounce
+        """
         # Valida se há um arquivo carregado
         if not getattr(self.main_window, 'current_file', None):
             self.main_window.logger.debug("Auto-save ignorado: nenhum arquivo carregado")
@@ -60,13 +68,42 @@ class FileOperations:
         if not self._validate_data_to_save():
             return False
 
+        excel_manager = self.main_window.excel_manager
+        if excel_manager.gravar_diario(self.main_window.current_file):
+            if not excel_manager.diario_excede_limite(self.main_window.current_file):
+                return True
+        else:
+            self.main_window.logger.warning("Diário indisponível; o arquivo será regravado por inteiro")
+
         # Reinicia o timer de debounce
         self.auto_save_timer.stop()
         self.auto_save_timer.start(self.AUTO_SAVE_DEBOUNCE_MS)
         return True
 
+    def compactar_diario(self):
+        """Incorpora o diário pendente ao arquivo e aguarda a gravação (ex.: ao fechar a janela)"""
+        self.auto_save_timer.stop()
+        self.pending_save = None
+        self.wait_for_save()
+        file_path = getattr(self.main_window, 'current_file', None)
+        excel_manager = self.main_window.excel_manager
+        if not file_path or excel_manager.df.empty or not excel_manager.tem_diario(file_path):
+            return False
+        self._save_and_notify(file_path, create_backup=False, show_messages=False)
+        return self.wait_for_save()
+
+    def wait_for_save(self):
+        """Bloqueia até a gravação em andamento terminar e trata o resultado na hora"""
+        thread = self.saver_thread
+        if thread is None:
+            return True
+        thread.wait()
+        # O sinal de término ainda está na fila de eventos; é ignorado depois disto
+        self._on_file_saved(thread, False, thread.success, thread.file_path)
+        return thread.success
+
     def _execute_auto_save(self):
-        """Executa o auto-save efetivamente (chamado pelo timer de debounce)"""
+        """Regrava o arquivo inteiro e apaga o diário (chamado pelo timer de debounce)"""
         if not getattr(self.main_window, 'current_file', None):
             return False
 
@@ -74,10 +111,7 @@ class FileOperations:
             return False
 
         # Salva sem criar backup e sem mostrar mensagens
-        success = self._save_and_notify(self.main_window.current_file, create_backup=False, show_messages=False)
-        if success:
-            self.main_window.logger.debug(f"Auto-save concluído: {self.main_window.current_file}")
-        return success
+        return self._save_and_notify(self.main_window.current_file, create_backup=False, show_messages=False)
 
     def save_file_as(self):
         """Salva como novo arquivo"""
@@ -102,82 +136,133 @@ class FileOperations:
         return self._save_and_notify(file_path, create_backup=True, show_messages=True)
 
     def _save_and_notify(self, file_path, create_backup=True, show_messages=True):
-        """Salva o arquivo e opcionalmente exibe mensagens apropriadas
+        """Inicia a gravação em segundo plano; mensagens são exibidas ao terminar
 
         Args:
             file_path: Caminho do arquivo a salvar
             create_backup: Se True, cria backup antes de salvar
             show_messages: Se True, mostra caixas de diálogo com mensagens
         """
-        try:
-            if create_backup:
-                if not self._create_backup(file_path):
-                    if show_messages:
-                        QMessageBox.warning(self.main_window, "Aviso", "Não foi possível criar backup do arquivo.")
+        if self.saver_thread is not None:
+            # Uma gravação por vez: a próxima parte de uma foto nova ao fim desta
+            self.pending_save = (file_path, create_backup, show_messages)
+            return True
 
-            success = self.main_window.excel_manager.save_excel(file_path)
-            if success:
-                if show_messages:
-                    QMessageBox.information(self.main_window, "Sucesso", f"Arquivo salvo em:\n{file_path}")
-                    self._show_post_save_message()
-                self.main_window.logger.debug(f"Arquivo salvo com sucesso: {file_path}")
-                return True
-            else:
-                if show_messages:
-                    QMessageBox.critical(self.main_window, "Erro", "Falha ao salvar arquivo.")
-                self.main_window.logger.error(f"Falha ao salvar arquivo: {file_path}")
-                return False
+        excel_manager = self.main_window.excel_manager
+        data_manager = self.main_window.data_manager
+        try:
+            foto = excel_manager.iniciar_gravacao()
+            self.saver_thread = FileSaverThread(
+                excel_manager,
+                file_path,
+                foto,
+                data_manager,
+                data_manager.versao,
+                self._create_backup if create_backup else None
+            )
+            self.saver_thread.progress.connect(self.main_window.progress_bar.setValue)
+            self.saver_thread.finished.connect(partial(self._on_file_saved, self.saver_thread, show_messages))
+            self._prepare_ui_for_saving()
+            self.saver_thread.start()
+            return True
         except Exception as e:
             self.main_window.logger.error(f"Erro ao salvar arquivo: {str(e)}")
+            excel_manager.concluir_gravacao(file_path, False)
+            self.saver_thread = None
             if show_messages:
                 QMessageBox.critical(self.main_window, "Erro", f"Falha ao salvar:\n{str(e)}")
             return False
 
-    def _create_backup(self, file_path):
-        """Cria backup do arquivo antes de salvar e remove backups antigos"""
-        backup_dir = os.path.join("resources", "backup")
-        os.makedirs(backup_dir, exist_ok=True)
+    def _on_file_saved(self, thread, show_messages, success, file_path):
+        """Callback quando a gravação termina"""
+        if thread is not self.saver_thread:
+            return  # Já tratado por wait_for_save
+        self.saver_thread = None
+        excel_manager = self.main_window.excel_manager
+        excel_manager.concluir_gravacao(file_path, success)
+
+        if success:
+            # Alterações feitas durante a gravação ficaram na fila; vão para o diário do arquivo novo
+            excel_manager.gravar_diario(file_path)
+            if show_messages:
+                if not thread.backup_ok:
+                    QMessageBox.warning(self.main_window, "Aviso", "Não foi possível criar backup do arquivo.")
+                QMessageBox.information(self.main_window, "Sucesso", f"Arquivo salvo em:\n{file_path}")
+                self._show_post_save_message()
+            self.main_window.logger.debug(f"Arquivo salvo com sucesso: {file_path}")
+        else:
+            if show_messages:
+                QMessageBox.critical(self.main_window, "Erro", "Falha ao salvar arquivo.")
+            self.main_window.logger.error(f"Falha ao salvar arquivo: {file_path}")
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"backup_{timestamp}_{os.path.basename(file_path)}"
-        backup_path = os.path.join(backup_dir, backup_name)
+        QTimer.singleShot(500, lambda: self.main_window.progress_bar.setVisible(False))
+        if self.pending_save:
+            pendente, self.pending_save = self.pending_save, None
+            self._save_and_notify(*pendente)
 
+    def _prepare_ui_for_saving(self):
+        """Mostra o progresso da gravação sem bloquear a janela"""
+        self.main_window.progress_bar.setRange(0, 100)
+        self.main_window.progress_bar.setValue(0)
+        self.main_window.progress_bar.setVisible(True)
+
+    def _create_backup(self, file_path):
+        """Registra a versão atual do arquivo nos backups (conteúdo repetido não é duplicado)"""
         try:
-            shutil.copy2(file_path, backup_path)
-            self.main_window.logger.debug(f"Backup criado: {backup_path}")
+            entrada = self.backup_store.criar(file_path)
+            self.main_window.logger.debug(f"Backup registrado: {entrada['hash']}")
 
-            # Limpa backups antigos do mesmo arquivo
-            self._cleanup_old_backups(backup_dir, file_path)
+            # Retenção pelo catálogo: só objetos sem referência são apagados
+            self.backup_store.reter(file_path, self.MAX_BACKUPS_PER_FILE)
             return True
         except Exception as e:
             self.main_window.logger.error(f"Erro ao criar backup: {str(e)}")
             return False
 
-    def _cleanup_old_backups(self, backup_dir, original_file_path):
-        """Remove backups antigos, mantendo apenas os últimos MAX_BACKUPS_PER_FILE"""
+    def get_backups(self):
+        """Versões guardadas do arquivo atual, da mais recente para a mais antiga"""
+        file_path = getattr(self.main_window, 'current_file', None)
+        if not file_path:
+            return []
+        return self.backup_store.listar(file_path)
+
+    def restore_backup(self, entrada):
+        """Substitui o arquivo atual pela versão escolhida e o recarrega"""
+        file_path = getattr(self.main_window, 'current_file', None)
+        if not file_path:
+            return False
+
+        resposta = QMessageBox.question(
+            self.main_window,
+            "Restaurar Backup",
+            f"Substituir {os.path.basename(file_path)} pela versão de "
+            f"{self._format_backup_date(entrada)}?\n\nO estado atual será guardado como backup antes.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if resposta != QMessageBox.Yes:
+            return False
+
         try:
-            original_name = os.path.basename(original_file_path)
-            # Encontra todos os backups deste arquivo
-            backups = [
-                f for f in os.listdir(backup_dir)
-                if f.endswith(original_name) and f.startswith("backup_")
-            ]
-
-            # Se há mais backups que o limite, remove os mais antigos
-            if len(backups) > self.MAX_BACKUPS_PER_FILE:
-                # Ordena por timestamp (mais antigos primeiro)
-                backups.sort()
-                to_remove = backups[:len(backups) - self.MAX_BACKUPS_PER_FILE]
-
-                for backup in to_remove:
-                    backup_path = os.path.join(backup_dir, backup)
-                    try:
-                        os.remove(backup_path)
-                        self.main_window.logger.debug(f"Backup removido: {backup_path}")
-                    except Exception as e:
-                        self.main_window.logger.warning(f"Falha ao remover backup {backup}: {str(e)}")
+            # O estado atual (com o diário incorporado) vira a versão mais recente.
+            # A retenção só roda depois: a versão escolhida pode ser a mais antiga
+            self.compactar_diario()
+            if os.path.exists(file_path):
+                self.backup_store.criar(file_path)
+            self.backup_store.restaurar(entrada, file_path)
+            self.backup_store.reter(file_path, self.MAX_BACKUPS_PER_FILE)
         except Exception as e:
-            self.main_window.logger.warning(f"Erro ao limpar backups antigos: {str(e)}")
+            self.main_window.logger.error(f"Erro ao restaurar backup: {str(e)}")
+            QMessageBox.critical(self.main_window, "Erro", f"Falha ao restaurar backup:\n{str(e)}")
+            return False
+
+        self.main_window.logger.info(f"Backup {entrada['hash']} restaurado em {file_path}")
+        return self.load_file(file_path)
+
+    @staticmethod
+    def _format_backup_date(entrada):
+        """Data do backup no formato dd/mm/aaaa hh:mm:ss"""
+        return datetime.fromisoformat(entrada['data']).strftime("%d/%m/%Y %H:%M:%S")
 
     def _show_post_save_message(self):
         """Exibe mensagem após salvar, mantendo contexto anterior se necessário"""
@@ -222,7 +307,11 @@ class FileOperations:
 
     def _start_async_load(self, file_path):
         """Inicia o carregamento assíncrono do arquivo"""
-        self.loader_thread = FileLoaderThread(self.main_window.excel_manager, file_path)
+        self.loader_thread = FileLoaderThread(
+            self.main_window.excel_manager,
+            file_path,
+            self.main_window.data_manager
+        )
         self.loader_thread.finished.connect(lambda success: self._on_file_loaded(success, file_path))
         self.loader_thread.start()
 
@@ -1,6 +1,6 @@
 import os
 from PyQt5.QtWidgets import QApplication, QAction, QMenu, QActionGroup
-from utils.styles import get_stylesheet, get_dark_stylesheet, apply_theme
+from utils.styles import get_stylesheet, get_dark_stylesheet, apply_theme, load_render_mode, save_render_mode
 
 class MenuManager:
     def __init__(self, main_window):
@@ -40,6 +40,11 @@ class MenuManager:
         self.recent_menu = QMenu("Abrir Recente", self.main_window)
         self.recent_menu.aboutToShow.connect(self._update_recent_menu)
         file_menu.addMenu(self.recent_menu)
+
+        # Versões guardadas do arquivo atual (lidas só do catálogo de backups)
+        self.backup_menu = QMenu("Restaurar Backup", self.main_window)
+        self.backup_menu.aboutToShow.connect(self._update_backup_menu)
+        file_menu.addMenu(self.backup_menu)
         file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
@@ -58,6 +63,31 @@ class MenuManager:
             theme_menu.addAction(action)
         self._update_theme_menu()
 
+        theme_menu.addSeparator()
+        self._setup_render_menu(theme_menu.addMenu("Sombras"))
+
+    def _setup_render_menu(self, render_menu):
+        """Configura o modo de renderização das sombras (leve = sem efeito gráfico)"""
+        self.render_action_group = QActionGroup(self.main_window)
+        modes = [
+            ("Automático (leve em listas grandes)", 'auto'),
+            ("Leves (melhor desempenho)", 'lightweight'),
+            ("Completas", 'full')
+        ]
+        current = load_render_mode()
+        for name, mode in modes:
+            action = QAction(name, self.main_window)
+            action.setCheckable(True)
+            action.setChecked(mode == current)
+            action.triggered.connect(lambda _, m=mode: self._change_render_mode(m))
+            self.render_action_group.addAction(action)
+            render_menu.addAction(action)
+
+    def _change_render_mode(self, mode):
+        """Altera o modo de renderização das sombras"""
+        save_render_mode(mode)
+        self.main_window._apply_render_mode()
+
     def _change_theme(self, theme_name):
         """Altera o tema da aplicação"""
         apply_theme(QApplication.instance(), theme_name)
@@ -92,6 +122,27 @@ class MenuManager:
             action = self.recent_menu.addAction("Erro ao carregar recentes")
             action.setEnabled(False)
 
+    def _update_backup_menu(self):
+        """Lista as versões do arquivo atual a partir do catálogo de backups"""
+        self.backup_menu.clear()
+        try:
+            backups = self.main_window.file_ops.get_backups()
+            if not backups:
+                action = self.backup_menu.addAction("Nenhum backup disponível")
+                action.setEnabled(False)
+                return
+            for entrada in backups:
+                data = self.main_window.file_ops._format_backup_date(entrada)
+                linhas = entrada.get('linhas')
+                texto = f"{data} — {linhas} registros" if linhas is not None else data
+                action = self.backup_menu.addAction(texto)
+                action.setToolTip(entrada['hash'])
+                action.triggered.connect(lambda checked, e=entrada: self.main_window.file_ops.restore_backup(e))
+        except Exception as e:
+            self.main_window.logger.error("Erro ao atualizar menu de backups", exc_info=True)
+            action = self.backup_menu.addAction("Erro ao carregar backups")
+            action.setEnabled(False)
+
     def _load_recent_file(self, file_path):
         """Carrega um arquivo recente"""
         self.main_window.file_ops.load_file(file_path)
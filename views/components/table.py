@@ -1,22 +1,35 @@
 from PyQt5.QtWidgets import QApplication, QHeaderView, QMenu, QAction, QTableView
-from PyQt5.QtCore import Qt, QSortFilterProxyModel
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QFont, QColor
+from PyQt5.QtCore import Qt, QSortFilterProxyModel, QAbstractTableModel, QModelIndex, QTimer
+from PyQt5.QtGui import QFont, QColor
 from utils.ui_helpers import MESSAGE_SUCCESS
+from utils.helpers import normalizar_texto, postos_colacao, chave_colacao
+import numpy as np
+import pandas as pd
 import string
+import sys
+import logging
 
 class TableManager:
     def __init__(self, table_view, message_handler=None):
         self.table = table_view
         self.proxy_model = NumericSortProxyModel()
         self.CHUNK_SIZE = 1000
-        self.current_chunk = 0
-        self.is_loading = False
-        self.full_data = None
+        self.full_data = None  # Referência ao DataFrame exibido (sem cópia)
+        self.full_order = None  # Posições de full_data em ordem (inicial, Sobrenome, Nome)
+        self.letter_offsets = None  # full_order[offsets[i]:offsets[i + 1]] = sobrenomes com a letra i
         self.search_active = False
+        self.page_active = False  # Modelo exibe a página da letra atual (e não resultados de busca)
         self.message_handler = message_handler
+        self.show_more_button = None  # Botão "mostrar mais" da busca (definido pela MainWindow)
+        self.logger = logging.getLogger(__name__)
 
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["Sobrenome", "Nome do(a) Aluno(a)", "RM"])
+        # Modelo único, reaproveitado: trocar os dados exibidos só troca a permutação
+        self.model = StudentTableModel(lote=self.CHUNK_SIZE)
+
+        # Depois da primeira tela, as demais linhas entram em blocos a cada volta do event loop
+        self.stream_timer = QTimer()
+        self.stream_timer.setInterval(0)
+        self.stream_timer.timeout.connect(self._stream_next_chunk)
         self.proxy_model.setSourceModel(self.model)
         self.table.setModel(self.proxy_model)
 
@@ -66,30 +79,6 @@ class TableManager:
             header.resizeSection(logicalIndex, desired_sizes[logicalIndex])
             header.blockSignals(False)
 
-    def _create_row_items(self, sobrenome, nome, rm):
-        sobrenome_item = QStandardItem(str(sobrenome))
-        nome_item = QStandardItem(str(nome))
-        try:
-            rm_float = float(rm)
-            formatted_rm = "{:,.0f}".format(rm_float).replace(",", ".")
-            rm_value = int(rm_float)
-        except Exception:
-            formatted_rm = str(rm)
-            rm_value = rm
-        rm_item = QStandardItem(formatted_rm)
-        rm_item.setData(rm_value, Qt.UserRole)
-
-        font = QFont()
-        font.setBold(True)
-        sobrenome_item.setFont(font)
-        font_rm = QFont()
-        font_rm.setBold(True)
-        rm_item.setForeground(QColor(Qt.red))
-        rm_item.setFont(font_rm)
-        rm_item.setTextAlignment(Qt.AlignCenter)
-
-        return [sobrenome_item, nome_item, rm_item]
-
     def update_table(self, data=None, sort_column=0, sort_order=Qt.AscendingOrder):
         """Atualiza a tabela com os dados fornecidos ou do excel_manager"""
         if data is None:
@@ -104,69 +93,218 @@ class TableManager:
         if data.empty:
             return
 
-        self.full_data = data.sort_values(
-            ['Sobrenome', 'Nome do(a) Aluno(a)'],
-            ascending=[True, True]
-        ).reset_index(drop=True)
-        self.current_chunk = 0
+        # Guarda só a permutação ordenada; as linhas são lidas por fatia quando exibidas
+        self.full_data = data
+        self.full_order, self.letter_offsets = self._ordem_alfabetica(data)
         self.search_active = False
 
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["Sobrenome", "Nome do(a) Aluno(a)", "RM"])
-        self.proxy_model.setSourceModel(self.model)
-
-        chunk = self.full_data.iloc[:self.CHUNK_SIZE]
-        for _, row in chunk.iterrows():
-            items = self._create_row_items(row['Sobrenome'], row['Nome do(a) Aluno(a)'], row['RM'])
-            self.model.appendRow(items)
+        # O DataFrame pode ter sido alterado no lugar: descarta as chaves de ordenação
+        self.model.limpar_chaves()
+        self.model.set_rows(self.full_data, self.full_order[:self.CHUNK_SIZE])
 
-        self.current_chunk = 1
         self.table.sortByColumn(sort_column, sort_order)
 
         # Mostra a página da letra atual
         self.set_page_by_letter(self.current_letter)
 
-    def update_table_with_data(self, data):
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["Sobrenome", "Nome do(a) Aluno(a)", "RM"])
-        for _, row in data.iterrows():
-            items = self._create_row_items(row['Sobrenome'], row['Nome do(a) Aluno(a)'], row['RM'])
-            self.model.appendRow(items)
-        self.proxy_model.setSourceModel(self.model)
+    def apply_row_changes(self, data, alteracoes):
+        """
+        Aplica só as linhas inseridas/removidas/alteradas por um comando: a ordem
+        alfabética é corrigida por busca binária e o modelo emite sinais apenas
+        dessas linhas, preservando seleção e scroll. Se o estado não bater com
+        as alterações (ex.: outra mudança no meio), reconstrói a tabela.
+        """
+        if self.full_data is None or self.full_order is None or not alteracoes:
+            self.update_table(data)
+            return
+        try:
+            aplicado = self._aplicar_alteracoes(data, alteracoes)
+        except Exception:
+            self.logger.exception("Erro ao aplicar alterações na tabela")
+            aplicado = False
+        if not aplicado:
+            self.update_table(data)
+            return
+        self._atualizar_botoes_letras()
+
+    def _aplicar_alteracoes(self, data, alteracoes):
+        antigo = self.full_data
+        removidas = np.unique(antigo.index.get_indexer(pd.Index(alteracoes['removidos'])))
+        inseridas = data.index.get_indexer(pd.Index(alteracoes['inseridos']))
+        alteradas = data.index.get_indexer(pd.Index(alteracoes['alterados']))
+        # drop preserva a ordem das demais linhas e as inserções vão para o fim
+        restantes = len(antigo) - len(removidas)
+        if ((removidas < 0).any() or (inseridas < restantes).any() or (alteradas < 0).any()
+                or len(data) != restantes + len(inseridas) or (len(alteradas) and len(removidas))):
+            return False
+
+        def remapear(posicoes):
+            """Posições em antigo -> posições em data (-1 = removida)"""
+            posicoes = np.asarray(posicoes, dtype=np.int64)
+            if not len(removidas):
+                return posicoes.copy()
+            i = np.searchsorted(removidas, posicoes)
+            novas = posicoes - i
+            novas[removidas[np.minimum(i, len(removidas) - 1)] == posicoes] = -1
+            return novas
+
+        # Linhas removidas ou editadas saem da ordem; editadas e novas entram de novo
+        iniciais = np.repeat(
+            np.arange(len(self.letter_offsets) - 1, dtype=np.int8), np.diff(self.letter_offsets)
+        )
+        manter = ~np.isin(self.full_order, np.concatenate([removidas, alteradas]))
+        ordem = remapear(self.full_order[manter])
+        iniciais = iniciais[manter]
+
+        entram = np.concatenate([alteradas, inseridas]).astype(np.int64)
+        if len(entram):
+            chave = self._chave_alfabetica(data)
+            codigos = self._codigos_iniciais(data['Sobrenome'].iloc[entram])
+            chaves = sorted((int(inicial),) + chave(pos) for pos, inicial in zip(entram, codigos))
+            destinos = [self._posicao_ordenada(ordem, iniciais, c, chave) for c in chaves]
+            # Inseridas juntas (já em ordem): destinos iguais mantêm a ordem dos valores
+            ordem = np.insert(ordem, destinos, [c[-1] for c in chaves])
+            iniciais = np.insert(iniciais, destinos, [c[0] for c in chaves])
+
+        self.full_data = data
+        self.full_order = ordem
+        self.letter_offsets = np.searchsorted(iniciais, np.arange(len(self.letter_offsets)))
+
+        if self.page_active:
+            inicio, fim = self.letter_range(self.current_letter)
+            pagina = self.full_order[inicio:fim]
+        else:
+            # Resultados de busca: só saem as removidas (inclusões não entram na busca)
+            pagina = remapear(self.model._base_order)
+            pagina = pagina[pagina >= 0]
+        self.model.sync_rows(data, pagina, remapear, alteradas)
+        return True
+
+    @staticmethod
+    def _chave_alfabetica(data):
+        """Função posição -> chave (Sobrenome, Nome, posição), a mesma ordem de _ordem_alfabetica"""
+        sobrenome = StudentTableModel._acessor(data['Sobrenome'])
+        nome = StudentTableModel._acessor(data['Nome do(a) Aluno(a)'])
+        return lambda pos: chave_colacao(sobrenome(pos)) + chave_colacao(nome(pos)) + (int(pos),)
+
+    @staticmethod
+    def _posicao_ordenada(ordem, iniciais, chave, chave_de):
+        """Busca binária do ponto de inserção de chave na faixa da sua inicial"""
+        lo = int(np.searchsorted(iniciais, chave[0], 'left'))
+        hi = int(np.searchsorted(iniciais, chave[0], 'right'))
+        while lo < hi:
+            meio = (lo + hi) // 2
+            if chave_de(ordem[meio]) < chave[1:]:
+                lo = meio + 1
+            else:
+                hi = meio
+        return lo
+
+    @classmethod
+    def _ordem_alfabetica(cls, data):
+        """
+        Permutação que ordena por inicial do sobrenome, Sobrenome e Nome, sem
+        copiar o DataFrame, e os offsets de cada letra nessa ordem (as iniciais
+        ordenadas formam faixas contíguas, localizadas por busca binária).
+        Os textos são comparados pelos mesmos postos do português usados ao
+        ordenar pelo cabeçalho, então as duas ordens concordam.
+        """
+        colunas = ['Sobrenome', 'Nome do(a) Aluno(a)']
+        iniciais = cls._codigos_iniciais(data['Sobrenome'])
+        chaves = [StudentTableModel._postos_texto(data[coluna]) for coluna in reversed(colunas)]
+        chaves.append(iniciais)
+        order = np.lexsort(chaves)
+
+        offsets = np.searchsorted(iniciais[order], np.arange(len(string.ascii_uppercase) + 2))
+        return order, offsets
+
+    @staticmethod
+    def _codigos_iniciais(serie):
+        """Inicial do sobrenome por linha: 0-25 para A-Z (acentos ignorados), 26 para as demais"""
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores, codigos = serie.cat.categories, serie.cat.codes.to_numpy()
+        else:
+            codigos, valores = pd.factorize(serie)
+        outros = len(string.ascii_uppercase)
+        por_valor = []
+        for valor in valores:
+            inicial = normalizar_texto(str(valor)[:1]).upper()
+            por_valor.append(ord(inicial) - ord('A') if 'A' <= inicial <= 'Z' else outros)
+        por_valor.append(outros)  # Código -1 (valor ausente) cai no último item
+        return np.array(por_valor, dtype=np.int8)[codigos]
+
+    def letter_range(self, letter):
+        """Faixa [início, fim) de full_order com sobrenomes iniciados pela letra"""
+        i = self.letters.index(letter.upper())
+        return int(self.letter_offsets[i]), int(self.letter_offsets[i + 1])
+
+    def letter_counts(self):
+        """Quantidade de alunos por letra, direto dos offsets"""
+        if self.letter_offsets is None:
+            return {}
+        contagens = np.diff(self.letter_offsets)
+        return {letter: int(contagens[i]) for i, letter in enumerate(self.letters)}
+
+    def restore_pages(self, data):
+        """
+        Volta à página da letra atual. Se data é o DataFrame já exibido, a ordem
+        alfabética (mantida em dia pelos comandos) é reaproveitada sem reordenar.
+        """
+        if data is self.full_data and self.full_order is not None and len(self.full_order) == len(data):
+            self.search_active = False
+            self.set_page_by_letter(self.current_letter)
+        else:
+            self.update_table(data)
+
+    def update_table_with_data(self, data, order=None):
+        """
+        Exibe as linhas de data (nas posições de order, se informado) sem copiá-las.
+        A primeira tela aparece na hora; o restante entra em blocos em segundo plano.
+        """
+        self._set_show_more_visible(False)
+        self.cancel_streaming()
+        self.model.set_rows(data, order)
         self.search_active = True
+        self.page_active = False
+        if self.model.canFetchMore():
+            self.stream_timer.start()
+
+    def update_table_with_ranked_data(self, data, has_more=False):
+        """Mostra resultados de busca na ordem de relevância recebida"""
+        self.update_table_with_data(data)
+        # Coluna -1: o proxy volta à ordem do modelo (ranking), sem indicador de ordenação
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
+        self._set_show_more_visible(has_more)
+
+    def _set_show_more_visible(self, visible):
+        if self.show_more_button is not None:
+            self.show_more_button.setVisible(visible)
+
+    def cancel_streaming(self):
+        """Interrompe a entrada em blocos (ex.: uma nova busca vai substituir as linhas)"""
+        self.stream_timer.stop()
+
+    def _stream_next_chunk(self):
+        self._load_data_chunk()
+        if not self.model.canFetchMore():
+            self.stream_timer.stop()
 
     def _load_data_chunk(self):
-        if self.is_loading or self.full_data is None or self.full_data.empty:
-            return
-
-        self.is_loading = True
+        """Expõe mais um bloco de linhas do modelo (página, lista completa ou busca)"""
         try:
-            start = self.current_chunk * self.CHUNK_SIZE
-            end = start + self.CHUNK_SIZE
-            chunk = self.full_data.iloc[start:end]
-            for _, row in chunk.iterrows():
-                items = self._create_row_items(row['Sobrenome'], row['Nome do(a) Aluno(a)'], row['RM'])
-                self.model.appendRow(items)
-            self.current_chunk += 1
+            if self.model.canFetchMore():
+                self.model.fetchMore()
         except Exception as e:
             print(f"Erro ao carregar chunk: {e}")
-        finally:
-            self.is_loading = False
 
     def _setup_scroll_connection(self):
         self.scroll_connection = self.table.verticalScrollBar().valueChanged.connect(self._on_scroll)
 
     def _on_scroll(self, value):
-        if (self.is_loading or self.full_data is None or
-            self.search_active or not hasattr(self, 'full_data')):
-            return
+        # Antecipa o próximo bloco antes de o scroll chegar ao fim
         scroll_bar = self.table.verticalScrollBar()
-        at_bottom = value >= scroll_bar.maximum() * 0.8
-        if at_bottom:
-            loaded = self.current_chunk * self.CHUNK_SIZE
-            total = len(self.full_data)
-            if loaded < total:
-                self._load_data_chunk()
+        if value >= scroll_bar.maximum() * 0.8:
+            self._load_data_chunk()
 
     def _setup_context_menu(self):
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -190,17 +328,10 @@ class TableManager:
                 self.on_edit_row_callback(aluno_data)
 
     def _get_row_data(self, row):
-        """Obtém os dados de uma linha específica"""
+        """Obtém os dados de uma linha específica (linha da view)"""
         try:
-            sobrenome = self.model.item(row, 0).text() if self.model.item(row, 0) else ""
-            nome = self.model.item(row, 1).text() if self.model.item(row, 1) else ""
-            rm_item = self.model.item(row, 2)
-            rm = rm_item.data(Qt.UserRole) if rm_item else None
-            return {
-                'Sobrenome': sobrenome,
-                'Nome do(a) Aluno(a)': nome,
-                'RM': rm
-            }
+            source_row = self.proxy_model.mapToSource(self.proxy_model.index(row, 0)).row()
+            return self.model.row_data(source_row)
         except Exception:
             return {}
 
@@ -234,13 +365,7 @@ class TableManager:
     def get_selected_rows_data(self):
         """Obtém os dados das linhas selecionadas como uma lista de dicionários"""
         selected_rows = set(index.row() for index in self.table.selectionModel().selectedRows())
-        data = []
-        for row in selected_rows:
-            sobrenome = self.model.item(row, 0).text()
-            nome = self.model.item(row, 1).text()
-            rm = self.model.item(row, 2).data(Qt.UserRole)
-            data.append({'Sobrenome': sobrenome, 'Nome do(a) Aluno(a)': nome, 'RM': rm})
-        return data
+        return [self._get_row_data(row) for row in selected_rows]
 
     def get_selected_row_data(self):
         """Obtém os dados da primeira linha selecionada"""
@@ -271,25 +396,31 @@ class TableManager:
         """Atualiza a tabela para mostrar apenas alunos cujo sobrenome começa com a letra dada."""
         if not self.full_data is None and not self.full_data.empty:
             self.current_letter = letter.upper()
-            mask = self.full_data['Sobrenome'].str.upper().str.startswith(self.current_letter)
-            filtered = self.full_data[mask]
-            self.update_table_with_data(filtered)
+            # A página é uma fatia da ordem alfabética (sem varrer os sobrenomes)
+            inicio, fim = self.letter_range(self.current_letter)
+            self.update_table_with_data(self.full_data, self.full_order[inicio:fim])
+            self.page_active = True
             # Volta o scroll para o topo ao trocar de página
             self.table.verticalScrollBar().setValue(0)
-            # Destaca o botão ativo (se MainWindow tiver page_buttons)
-            if hasattr(self, 'main_window') and hasattr(self.main_window, 'page_buttons'):
-                for l, btn in self.main_window.page_buttons.items():
-                    if l == self.current_letter:
-                        btn.setProperty("class", "az-page-btn active")
-                    else:
-                        btn.setProperty("class", "az-page-btn")
-                    btn.style().unpolish(btn)
-                    btn.style().polish(btn)
+            self._atualizar_botoes_letras()
             if self.message_handler:
                 self.message_handler.show_temporary_message(
-                    f"Exibindo alunos com sobrenome iniciando por '{self.current_letter}'", "default"
+                    f"Exibindo {fim - inicio} alunos com sobrenome iniciando por '{self.current_letter}'", "default"
                 )
 
+    def _atualizar_botoes_letras(self):
+        """Destaca o botão ativo e atualiza as contagens (se MainWindow tiver page_buttons)"""
+        if hasattr(self, 'main_window') and hasattr(self.main_window, 'page_buttons'):
+            counts = self.letter_counts()
+            for l, btn in self.main_window.page_buttons.items():
+                if l == self.current_letter:
+                    btn.setProperty("class", "az-page-btn active")
+                else:
+                    btn.setProperty("class", "az-page-btn")
+                btn.setToolTip(f"{l}: {counts.get(l, 0)} aluno(s)")
+                btn.style().unpolish(btn)
+                btn.style().polish(btn)
+
     def next_letter(self):
         idx = self.letters.index(self.current_letter)
         if idx < len(self.letters) - 1:
@@ -300,7 +431,306 @@ class TableManager:
         if idx > 0:
             self.set_page_by_letter(self.letters[idx - 1])
 
+class StudentTableModel(QAbstractTableModel):
+    """
+    Modelo virtual sobre o DataFrame: guarda só a referência às colunas e as
+    posições exibidas, e monta cada célula em data() quando a view pede.
+    Fonte e cor são compartilhadas (via roles) e o texto formatado de cada RM
+    fica em cache, então exibir N linhas não cria N objetos Qt.
+    """
+
+    HEADERS = ["Sobrenome", "Nome do(a) Aluno(a)", "RM"]
+    MAX_FAIXAS_INCREMENTAIS = 64  # Acima disso, um reset sai mais barato que um sinal por faixa
+
+    def __init__(self, parent=None, lote=1000):
+        super().__init__(parent)
+        self._lote = lote  # Linhas expostas à view na primeira tela e a cada fetchMore
+        self._limite = 0  # Quantas linhas de _order a view já conhece
+        self._data = None
+        self._base_order = np.empty(0, dtype=np.int64)  # Ordem recebida (sem ordenação por coluna)
+        self._order = self._base_order  # Linha do modelo -> posição em _data
+        self._colunas = (None, None, None)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        self._rm_texto = {}  # RM -> texto formatado (reaproveitado entre atualizações)
+        self._chaves = {}  # Coluna -> chave de ordenação por posição (válida enquanto _data não muda)
+
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+        self._rm_color = QColor(Qt.red)
+
+    # --- Dados exibidos ---
+
+    def set_rows(self, data, order=None):
+        """Troca as linhas exibidas (posições de data, na ordem dada)"""
+        self.beginResetModel()
+        if data is not self._data:
+            self._chaves = {}
+        self._data = data
+        self._colunas = tuple(self._acessor(data[col]) for col in self.HEADERS)
+        self._base_order = np.arange(len(data)) if order is None else np.asarray(order, dtype=np.int64)
+        self._order = self._sorted(self._base_order)
+        self._limite = self._lote
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._limite < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Expõe o próximo bloco de linhas (a view chama ao rolar até o fim)"""
+        if not self.canFetchMore(parent):
+            return
+        first = self._limite
+        last = min(len(self._order), first + self._lote) - 1
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._limite = last + 1
+        self.endInsertRows()
+
+    def _expor_tudo(self):
+        """Expõe todas as linhas (antes de operações que movem linhas arbitrárias)"""
+        if self._limite >= len(self._order):
+            self._limite = sys.maxsize
+            return
+        self.beginInsertRows(QModelIndex(), self._limite, len(self._order) - 1)
+        self._limite = sys.maxsize
+        self.endInsertRows()
+
+    def sync_rows(self, data, order, remapear=None, alteradas=()):
+        """
+        Troca as linhas exibidas emitindo sinais só das que mudaram
+        (beginRemoveRows/beginInsertRows/dataChanged), preservando seleção e scroll.
+
+        Args:
+            data: DataFrame atual
+            order: nova ordem recebida (posições de data)
+            remapear: posições antigas -> posições em data (-1 = removida)
+            alteradas: posições de data cujas células mudaram
+        """
+        self._expor_tudo()
+        antigas = self._order if remapear is None else remapear(self._order)
+        alteradas = np.asarray(alteradas, dtype=np.int64)
+        self._data = data
+        self.limpar_chaves()
+        self._colunas = tuple(self._acessor(data[col]) for col in self.HEADERS)
+        self._base_order = np.asarray(order, dtype=np.int64)
+        nova = self._sorted(self._base_order)
+
+        # Linha de cada linha atual na nova ordem (-1 = sai)
+        destino = np.full(len(antigas), -1, dtype=np.int64)
+        if len(nova) and len(antigas):
+            indice = np.argsort(nova, kind='stable')
+            achadas = indice[np.minimum(np.searchsorted(nova, antigas, sorter=indice), len(nova) - 1)]
+            encontradas = nova[achadas] == antigas
+            destino[encontradas] = achadas[encontradas]
+        ficam = destino >= 0
+        presentes = np.zeros(len(nova), dtype=bool)
+        presentes[destino[ficam]] = True
+        saem = self._faixas(np.flatnonzero(~ficam))
+        # Uma linha editada que trocou de lugar: as novas entram no fim e um
+        # layoutChanged reposiciona tudo, mantendo a seleção
+        reordenar = not self._crescente(destino[ficam])
+        if reordenar:
+            restantes = int(ficam.sum())
+            entram = [(restantes, len(nova) - 1)] if restantes < len(nova) else []
+        else:
+            entram = self._faixas(np.flatnonzero(~presentes))
+
+        if len(saem) + len(entram) > self.MAX_FAIXAS_INCREMENTAIS:
+            self.beginResetModel()
+            self._order = nova
+            self.endResetModel()
+            return
+
+        self._order = antigas
+        for inicio, fim in reversed(saem):
+            self.beginRemoveRows(QModelIndex(), inicio, fim)
+            self._order = np.delete(self._order, np.s_[inicio:fim + 1])
+            self.endRemoveRows()
+        if reordenar:
+            if entram:
+                self.beginInsertRows(QModelIndex(), *entram[0])
+                self._order = np.concatenate([self._order, nova[~presentes]])
+                self.endInsertRows()
+            self._reordenar(nova)
+        else:
+            for inicio, fim in entram:
+                self.beginInsertRows(QModelIndex(), inicio, fim)
+                self._order = np.insert(self._order, inicio, nova[inicio:fim + 1])
+                self.endInsertRows()
+            self._order = nova
+
+        ultima_coluna = len(self.HEADERS) - 1
+        for inicio, fim in self._faixas(np.flatnonzero(presentes & np.isin(nova, alteradas))):
+            self.dataChanged.emit(self.index(inicio, 0), self.index(fim, ultima_coluna))
+
+    @staticmethod
+    def _crescente(linhas):
+        return len(linhas) < 2 or bool(np.all(np.diff(linhas) > 0))
+
+    @staticmethod
+    def _faixas(linhas):
+        """Agrupa linhas ordenadas em faixas contíguas [(início, fim), ...]"""
+        if not len(linhas):
+            return []
+        grupos = np.split(linhas, np.flatnonzero(np.diff(linhas) != 1) + 1)
+        return [(int(g[0]), int(g[-1])) for g in grupos]
+
+    def row_data(self, row):
+        """Dicionário com Sobrenome, Nome e RM (numérico) da linha do modelo"""
+        pos = self._order[row]
+        sobrenome, nome, rm = (coluna(pos) for coluna in self._colunas)
+        return {
+            'Sobrenome': str(sobrenome),
+            'Nome do(a) Aluno(a)': str(nome),
+            'RM': self._rm_formatado(rm)[1]
+        }
+
+    @staticmethod
+    def _acessor(serie):
+        """Função posição -> valor que não materializa a coluna inteira"""
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = serie.cat.categories.to_numpy(dtype=object)
+            codigos = serie.cat.codes.to_numpy()
+            return lambda pos: categorias[codigos[pos]] if codigos[pos] >= 0 else ''
+        valores = serie.array
+        return valores.__getitem__
+
+    def _rm_formatado(self, rm):
+        """(texto, valor numérico) do RM, com o texto em cache"""
+        try:
+            rm_value = int(float(rm))
+        except Exception:
+            return str(rm), rm
+        texto = self._rm_texto.get(rm_value)
+        if texto is None:
+            texto = "{:,.0f}".format(rm_value).replace(",", ".")
+            self._rm_texto[rm_value] = texto
+        return texto, rm_value
+
+    # --- Interface do QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else min(len(self._order), self._limite)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        if role == Qt.DisplayRole:
+            valor = self._colunas[col](self._order[index.row()])
+            if col == 2:
+                return self._rm_formatado(valor)[0]
+            return str(valor)
+        if role == Qt.UserRole and col == 2:
+            return self._rm_formatado(self._colunas[2](self._order[index.row()]))[1]
+        if role == Qt.FontRole and col != 1:
+            return self._bold_font
+        if role == Qt.ForegroundRole and col == 2:
+            return self._rm_color
+        if role == Qt.TextAlignmentRole and col == 2:
+            return Qt.AlignCenter
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder, linhas_mantidas=()):
+        """
+        Reordena as linhas com um argsort vetorizado (column -1 = ordem recebida).
+
+        Args:
+            linhas_mantidas: linhas que devem continuar expostas após reordenar
+                (ex.: seleção guardada por um proxy, que o modelo não enxerga)
+        """
+        self._sort_column = column
+        self._sort_order = order
+        if self._data is None:
+            return
+        self._reordenar(self._sorted(self._base_order), linhas_mantidas)
+
+    def _reordenar(self, nova, linhas_mantidas=()):
+        """Troca a ordem das mesmas linhas, levando junto os índices persistentes (seleção)"""
+        nova_linha = np.empty(len(self._data), dtype=np.int64)
+        nova_linha[nova] = np.arange(len(nova))
+
+        # Uma linha selecionada pode ir para além do bloco exposto. O layoutChanged
+        # não pode mudar o rowCount, então o bloco cresce antes, com beginInsertRows
+        linhas = list(linhas_mantidas) + [i.row() for i in self.persistentIndexList()]
+        if linhas:
+            necessarias = int(nova_linha[self._order[np.asarray(linhas, dtype=np.int64)]].max()) + 1
+            if necessarias > self.rowCount():
+                self.beginInsertRows(QModelIndex(), self.rowCount(), necessarias - 1)
+                self._limite = necessarias
+                self.endInsertRows()
+
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        posicoes = np.asarray([self._order[i.row()] for i in persistentes], dtype=np.int64)
+
+        self._order = nova
+
+        if persistentes:
+            total = self.rowCount()
+            self.changePersistentIndexList(persistentes, [
+                self.index(int(linha), i.column()) if linha < total else QModelIndex()
+                for i, linha in zip(persistentes, nova_linha[posicoes])
+            ])
+        self.layoutChanged.emit()
+
+    def _sorted(self, base_order):
+        if self._sort_column < 0 or not len(base_order):
+            return base_order
+        chaves = self._chave_ordenacao(self._sort_column)
+        perm = np.argsort(chaves[base_order], kind='stable')
+        if self._sort_order == Qt.DescendingOrder:
+            perm = perm[::-1]
+        return base_order[perm]
+
+    def limpar_chaves(self):
+        self._chaves = {}
+
+    def _chave_ordenacao(self, coluna):
+        """
+        Chave numérica por posição de _data: RM como número e textos pelo posto
+        na ordem do português (postos_colacao), calculada uma vez por coluna.
+        """
+        chaves = self._chaves.get(coluna)
+        if chaves is None:
+            serie = self._data[self.HEADERS[coluna]]
+            if coluna == 2:
+                chaves = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            else:
+                chaves = self._postos_texto(serie)
+            self._chaves[coluna] = chaves
+        return chaves
+
+    @staticmethod
+    def _postos_texto(serie):
+        """Posto de cada linha na ordem do português, calculado só sobre os valores distintos"""
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores, codigos = serie.cat.categories, serie.cat.codes.to_numpy()
+        else:
+            codigos, valores = pd.factorize(serie)
+        # Código -1 (valor ausente) cai no último item: vai para o início
+        return np.append(postos_colacao(valores), -1)[codigos]
+
+
 class NumericSortProxyModel(QSortFilterProxyModel):
+    def sort(self, column, order=Qt.AscendingOrder):
+        # O StudentTableModel ordena a si mesmo em bloco; o proxy só repassa
+        source = self.sourceModel()
+        if isinstance(source, StudentTableModel):
+            # Linhas da seleção/índice atual no proxy: o modelo as mantém expostas
+            linhas = [self.mapToSource(i).row() for i in self.persistentIndexList()]
+            source.sort(column, order, [linha for linha in linhas if linha >= 0])
+            return
+        super().sort(column, order)
+
     def lessThan(self, left, right):
         if left.column() == 2:
             left_data = self.sourceModel().data(left, Qt.UserRole)
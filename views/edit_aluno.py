@@ -179,25 +179,23 @@ class EditAlunoWindow(QDialog, CenterWindowMixin):
         df = self.excel_manager.df
         # Verifica existência de RM duplicado (exceto o próprio registro)
         if rm_antigo_int is None:
-            match = df[df['RM'] == novo_rm]
+            real_idx = self.data_manager.get_row_id_por_rm(novo_rm)
         else:
-            if novo_rm != rm_antigo_int and novo_rm in df['RM'].values:
-                aluno_existente = df[df['RM'] == novo_rm].iloc[0]['Nome do(a) Aluno(a)']
+            aluno_existente = self.data_manager.get_nome_por_rm(novo_rm)
+            if novo_rm != rm_antigo_int and aluno_existente is not None:
                 QMessageBox.warning(
                     self,
                     "RM Duplicado",
                     f"Já existe um aluno com o RM {novo_rm}:\n{aluno_existente}\n\nPor favor, verifique o RM."
                 )
                 return
-            match = df[df['RM'] == rm_antigo_int]
+            real_idx = self.data_manager.get_row_id_por_rm(rm_antigo_int)
 
-        if match.empty:
+        if real_idx is None:
             QMessageBox.warning(self, "Erro", "Aluno não encontrado na base de dados.")
             self.reject()
             return
 
-        real_idx = match.index[0]
-
         # Formata nome e extrai sobrenome (mesma lógica do adicionar)
         nome_formatado = formatar_nome(nome)
         sobrenome_novo = extrair_sobrenome(nome_formatado)
@@ -228,9 +226,9 @@ class EditAlunoWindow(QDialog, CenterWindowMixin):
 
         # Prepara e executa comandos de edição para cada coluna alterada
         try:
-            old_sobrenome = df.iat[real_idx, 0]
-            old_nome = df.iat[real_idx, 1]
-            old_rm = df.iat[real_idx, 2]
+            old_sobrenome = df.at[real_idx, 'Sobrenome']
+            old_nome = df.at[real_idx, 'Nome do(a) Aluno(a)']
+            old_rm = df.at[real_idx, 'RM']
 
             edits = []
             if str(sobrenome_novo) != str(old_sobrenome):
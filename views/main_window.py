@@ -10,8 +10,8 @@ from models.command_manager import CommandManager, RemoveStudentsCommand, EditSt
 from models.data_manager import DataManager
 from models.excel_manager import ExcelManager
 from models.search_manager import SearchManager
-from utils.styles import apply_theme, load_theme_preference
-from utils.ui_helpers import CenterWindowMixin, add_shadow, MessageHandler, update_shadows_on_theme_change, MESSAGE_DEFAULT
+from utils.styles import apply_theme, load_theme_preference, use_lightweight_shadows
+from utils.ui_helpers import CenterWindowMixin, add_shadow, MessageHandler, set_shadow_mode, update_shadows_on_theme_change, MESSAGE_DEFAULT
 from views.window_manager import WindowManager
 from views.components.menu import MenuManager
 from views.components.table import TableManager
@@ -28,6 +28,8 @@ class MainWindow(QMainWindow, CenterWindowMixin):
         self.command_manager = CommandManager()
         self.command_manager.operation_started.connect(self._handle_operation_start)
         self.command_manager.operation_finished.connect(self._handle_operation_finish)
+        self.command_manager.rows_changed.connect(self._handle_rows_changed)
+        self._alteracoes_pendentes = None
         self.excel_manager = ExcelManager()
         self.data_manager = DataManager(self.excel_manager)
         self.current_file = None
@@ -41,7 +43,9 @@ class MainWindow(QMainWindow, CenterWindowMixin):
             self._init_ui()
             self._connect_signals()
 
-            self.search_manager = SearchManager(self.excel_manager, self.table_manager, self.message_handler)
+            self.search_manager = SearchManager(
+                self.excel_manager, self.table_manager, self.message_handler, self.data_manager
+            )
 
             self._init_settings()
             self.table_manager.main_window = self
@@ -160,7 +164,7 @@ class MainWindow(QMainWindow, CenterWindowMixin):
             self.search_field = QLineEdit()
             self.search_field.setObjectName("search_field")
             self.search_field.setPlaceholderText("Buscar por nome ou RM...")
-            self.search_field.setToolTip("Digite parte do nome ou RM e pressione Enter ou clique na lupa para pesquisar")
+            self.search_field.setToolTip("Digite parte do nome ou RM; os resultados aparecem enquanto você digita")
 
             self.search_btn = QPushButton()
             self.search_btn.setIcon(QIcon("assets/images/lupa_icon_white.png"))
@@ -200,6 +204,14 @@ class MainWindow(QMainWindow, CenterWindowMixin):
             self.table_manager = TableManager(self.table, self.message_handler)
             content_layout.addWidget(self.table)
 
+            # Mostrar mais resultados (visível só quando a busca tem mais que o top K)
+            self.show_more_btn = QPushButton("Mostrar mais resultados")
+            self.show_more_btn.setObjectName("show_more_btn")
+            self.show_more_btn.setCursor(Qt.PointingHandCursor)
+            self.show_more_btn.setVisible(False)
+            self.table_manager.show_more_button = self.show_more_btn
+            content_layout.addWidget(self.show_more_btn)
+
             # Sombras (lista informativa, o método _get_elements_with_shadow retorna a lista real)
             self.elements_with_shadow = [
                 self.sidebar,
@@ -216,6 +228,7 @@ class MainWindow(QMainWindow, CenterWindowMixin):
             ]
             for element in self._get_elements_with_shadow():
                 add_shadow(element)
+            self._apply_render_mode()
 
             window_layout_layout.addWidget(self.content_widget)
             # right stretch balances the left stretch and keeps layout centered
@@ -271,9 +284,10 @@ class MainWindow(QMainWindow, CenterWindowMixin):
             self.btn_redo.setShortcut("Ctrl+Y")
             self.btn_save.setShortcut("Ctrl+S")
 
-            self.search_btn.clicked.connect(lambda: self.search_manager.search_student(self.search_field.text()))
-            self.search_field.returnPressed.connect(lambda: self.search_manager.search_student(self.search_field.text()))
+            self.search_btn.clicked.connect(lambda: self.search_manager.search_now(self.search_field.text()))
+            self.search_field.returnPressed.connect(lambda: self.search_manager.search_now(self.search_field.text()))
             self.search_field.textChanged.connect(self._handle_search_change)
+            self.show_more_btn.clicked.connect(lambda: self.search_manager.show_more())
 
             # Configura o cabeçalho para ordenação
             header = self.table.horizontalHeader()
@@ -351,8 +365,29 @@ class MainWindow(QMainWindow, CenterWindowMixin):
 
         self.table_manager.update_table(data)
         self._update_buttons_state()
+        self._update_default_message()
+        self._apply_render_mode()
+
+    def _apply_row_changes(self, alteracoes):
+        """Aplica na tabela só as linhas alteradas por um comando (sem reconstruí-la)"""
+        if not hasattr(self.excel_manager, 'df'):
+            return
+        self.table_manager.apply_row_changes(self.excel_manager.df, alteracoes)
+        self._update_buttons_state()
+        self._update_default_message()
+        self._apply_render_mode()
+
+    def _get_elements_with_light_shadow(self):
+        """Elementos que repintam a cada scroll ou tecla: só neles a sombra vira borda no modo leve"""
+        return [self.search_field, self.table]
 
-        # Atualiza a mensagem padrão com a contagem atual de registros
+    def _apply_render_mode(self):
+        """Sombras leves no modo 'lightweight' ou, no 'auto', acima do limite de alunos"""
+        row_count = len(self.excel_manager.df) if hasattr(self.excel_manager, 'df') else 0
+        set_shadow_mode(self._get_elements_with_light_shadow(), use_lightweight_shadows(row_count))
+
+    def _update_default_message(self):
+        """Atualiza a mensagem padrão com a contagem atual de registros"""
         if hasattr(self.excel_manager, 'df') and not self.excel_manager.df.empty:
             count = len(self.excel_manager.df)
             self.message_handler.set_default_message(f"Exibindo {count} registros", MESSAGE_DEFAULT)
@@ -375,9 +410,8 @@ class MainWindow(QMainWindow, CenterWindowMixin):
         self.btn_redo.setEnabled(has_data and len(self.command_manager.redo_stack) > 0)
 
     def _handle_search_change(self, text):
-        """Reage a mudanças no campo de busca"""
-        if not text.strip():
-            self.search_manager.restore_full_list()
+        """Reage a mudanças no campo de busca (busca enquanto digita, em segundo plano)"""
+        self.search_manager.schedule_live_search(text)
         self.table_manager.clear_selection()
 
     def _handle_delete_action(self):
@@ -411,11 +445,19 @@ class MainWindow(QMainWindow, CenterWindowMixin):
         self.message_handler.show_message(message, "loading")
         self._set_ui_enabled(False)  # Desabilita UI durante operação
 
+    def _handle_rows_changed(self, alteracoes):
+        """Guarda as linhas alteradas pelo comando até o fim da operação"""
+        self._alteracoes_pendentes = alteracoes
+
     def _handle_operation_finish(self, success, message):
         """Lida com o fim de uma operação"""
         self._set_ui_enabled(True)
+        alteracoes, self._alteracoes_pendentes = self._alteracoes_pendentes, None
         if success:
-            self._update_table()
+            if alteracoes is not None:
+                self._apply_row_changes(alteracoes)
+            else:
+                self._update_table()
             self.message_handler.show_temporary_message(message, "success")
             # Auto-save dos dados após operação bem-sucedida
             if hasattr(self, 'file_ops'):
@@ -436,6 +478,12 @@ class MainWindow(QMainWindow, CenterWindowMixin):
         """Garante que o diretório de recursos existe para carregar e salvar os arquivos"""
         os.makedirs("resources", exist_ok=True)
 
+    def closeEvent(self, event):
+        """Incorpora o diário de alterações ao arquivo antes de fechar"""
+        if hasattr(self, 'file_ops'):
+            self.file_ops.compactar_diario()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         """Ajusta layout ao redimensionar"""
         super().resizeEvent(event)
@@ -90,10 +90,7 @@ class WindowManager:
             aluno_data=aluno_data
         )
 
-        # Conecta todos os sinais necessários
-        self.edit_aluno_window.aluno_editado_signal.connect(
-            self.main_window._update_table
-        )
+        # A tabela é atualizada pelos próprios comandos de edição (só a linha alterada)
         self.edit_aluno_window.aluno_editado_signal.connect(
             lambda: self.main_window.btn_save.setEnabled(True)
         )